@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import (
-    OnboardingSession, Client, Tag, SessionTag, InternalNote, Task,
+    OnboardingSession, Client, Tag, SessionTag, InternalNote, Task, AIJob,
     MediaAsset, SEO, WebsiteHero, WebsiteSection, WebsiteTestimonial, WebsiteFooter
 )
 
@@ -33,6 +33,13 @@ class TaskAdmin(admin.ModelAdmin):
     list_filter = ['priority', 'completed', 'created_at']
 
 
+@admin.register(AIJob)
+class AIJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'session', 'status', 'attempts', 'worker', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status', 'created_at']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
 @admin.register(OnboardingSession)
 class OnboardingSessionAdmin(admin.ModelAdmin):
     list_display = ['id', 'client', 'course_title', 'status', 'assignee', 'steps_completed', 'created_at']
@@ -71,8 +78,8 @@ class OnboardingSessionAdmin(admin.ModelAdmin):
 class MediaAssetAdmin(admin.ModelAdmin):
     list_display = ['title', 'folder', 'width', 'height', 'format', 'created_at']
     list_filter = ['folder', 'format', 'created_at']
-    search_fields = ['title', 'cloudinary_public_id']
-    readonly_fields = ['cloudinary_url', 'cloudinary_public_id', 'original_url', 'web_url', 'thumbnail_url', 'width', 'height', 'file_size', 'format', 'created_at', 'updated_at']
+    search_fields = ['title', 'cloudinary_public_id', 'content_hash']
+    readonly_fields = ['cloudinary_url', 'cloudinary_public_id', 'original_url', 'web_url', 'thumbnail_url', 'width', 'height', 'file_size', 'format', 'content_hash', 'perceptual_hash', 'derivatives', 'created_at', 'updated_at']
 
 
 @admin.register(SEO)
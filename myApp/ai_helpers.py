@@ -0,0 +1,252 @@
+"""
+AI Helpers - OpenAI client access and prompt response caching
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import openai
+from django.conf import settings
+
+
+def get_openai_client():
+    """OpenAI client for the configured key (patch this to use a stub client offline)"""
+    return openai.OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=getattr(settings, 'OPENAI_BASE_URL', None) or None,
+    )
+
+
+# One async client (and so one HTTP connection pool) per event loop. Open
+# connections reference their loop, so entries are pruned when the loop closes
+# rather than held in a WeakKeyDictionary (which could never drop them).
+_async_clients = {}
+_async_clients_lock = threading.Lock()
+
+
+def get_async_openai_client():
+    """
+    Async OpenAI client with a per-call timeout (OPENAI_BASE_URL can point at a local fake server).
+    Created once per event loop and configuration, so calls reuse its connections.
+    """
+    base_url = getattr(settings, 'OPENAI_BASE_URL', None) or None
+    timeout = getattr(settings, 'AI_REQUEST_TIMEOUT', 30)
+    config = (settings.OPENAI_API_KEY, base_url, timeout)
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        if loop not in _async_clients:
+            for closed in [other for other in _async_clients if other.is_closed()]:
+                del _async_clients[closed]
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(config)
+        if client is None:
+            client = clients[config] = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=base_url,
+                timeout=timeout,
+                max_retries=0,
+            )
+    return client
+
+
+# One semaphore per event loop (WSGI runs each async view in its own loop)
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _get_semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(getattr(settings, 'AI_MAX_CONCURRENCY', 50))
+    return semaphore
+
+
+async def acompletion(model, messages, **params):
+    """
+    Async chat completion text. Outbound calls are capped by the
+    AI_MAX_CONCURRENCY semaphore and each is bounded by AI_REQUEST_TIMEOUT
+    (asyncio.TimeoutError when it runs out).
+    """
+    timeout = getattr(settings, 'AI_REQUEST_TIMEOUT', 30)
+    async with _get_semaphore():
+        try:
+            response = await asyncio.wait_for(
+                get_async_openai_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    **params
+                ),
+                timeout=timeout,
+            )
+        except openai.APITimeoutError as e:
+            # The client's own timeout can fire first; report both the same way
+            raise asyncio.TimeoutError() from e
+    return response.choices[0].message.content.strip()
+
+
+def prompt_fingerprint(model, messages, **params):
+    """Stable hash of everything that determines a completion"""
+    payload = json.dumps(
+        {'model': model, 'messages': messages, 'params': params},
+        sort_keys=True, separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _InflightCall:
+    """A running upstream call that identical requests can wait on"""
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class PromptCache:
+    """
+    In-process response cache keyed by prompt fingerprint.
+    Entries expire after `ttl` seconds and the least recently used entries
+    are evicted beyond `max_entries`. Concurrent misses for the same key are
+    coalesced so only one upstream call is made (single-flight).
+    """
+    def __init__(self, ttl=3600, max_entries=1000, wait_timeout=60):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}
+        self._ainflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_call(self, key, fn):
+        """Return the cached value for key, or call fn() once and cache its result"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InflightCall()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if not call.event.wait(self.wait_timeout):
+                raise TimeoutError('Timed out waiting for an identical AI request')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            # Errors are shared with waiters but never cached
+            call.error = e
+            raise
+        else:
+            self._store(key, call.result)
+            return call.result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    async def aget_or_call(self, key, coro_fn):
+        """Async get_or_call: concurrent misses for the same key await one task"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            task = self._ainflight.get(key)
+            if task is None or task.get_loop() is not asyncio.get_running_loop():
+                task = self._ainflight[key] = asyncio.ensure_future(self._acall(key, coro_fn))
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        # shield: one cancelled request must not cancel the call others are waiting on
+        return await asyncio.shield(task)
+
+    async def _acall(self, key, coro_fn):
+        try:
+            result = await coro_fn()
+            self._store(key, result)
+            return result
+        finally:
+            with self._lock:
+                if self._ainflight.get(key) is asyncio.current_task():
+                    del self._ainflight[key]
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'inflight': len(self._inflight) + len(self._ainflight),
+            }
+
+
+ai_help_cache = PromptCache(
+    ttl=getattr(settings, 'AI_HELP_CACHE_TTL', 3600),
+    max_entries=getattr(settings, 'AI_HELP_CACHE_MAX_ENTRIES', 1000),
+)
+
+
+def cached_completion(model, messages, cache=ai_help_cache, **params):
+    """
+    Chat completion text for (model, messages, params), served from `cache`
+    when an identical prompt was answered recently.
+    """
+    key = prompt_fingerprint(model, messages, **params)
+
+    def call():
+        response = get_openai_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            **params
+        )
+        return response.choices[0].message.content.strip()
+
+    return cache.get_or_call(key, call)
+
+
+async def acached_completion(model, messages, cache=ai_help_cache, **params):
+    """Async cached_completion: shares the response cache, bounded by the AI semaphore"""
+    key = prompt_fingerprint(model, messages, **params)
+    return await cache.aget_or_call(key, lambda: acompletion(model, messages, **params))
@@ -0,0 +1,174 @@
+"""
+AI Jobs - Database-backed queue for slow AI generation work
+
+Views enqueue an AIJob and return its id immediately; worker processes
+started with `python manage.py run_ai_worker` claim queued jobs, call
+OpenAI and store the result on the session. Claiming is a conditional
+UPDATE, so any number of workers can share the table safely. The same
+queue carries client reconciles (see client_helpers).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .client_helpers import reconcile_session_client
+from .models import AIJob, OnboardingSession
+from .summary_helpers import get_or_generate_summary, is_summary_current
+
+ACTIVE_STATUSES = ['queued', 'running']
+CLAIM_BATCH = 10
+
+
+def get_max_attempts():
+    return getattr(settings, 'AI_JOB_MAX_ATTEMPTS', 3)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before retrying a job that has failed `attempts` times (exponential, capped)"""
+    base = getattr(settings, 'AI_JOB_RETRY_BASE_SECONDS', 30)
+    return min(base * 2 ** max(attempts - 1, 0), getattr(settings, 'AI_JOB_RETRY_MAX_SECONDS', 60 * 60))
+
+
+def enqueue_summary(session, user=None, force=False):
+    """Queue a summary for the session, reusing a job that is already queued or running"""
+    job = AIJob.objects.filter(
+        kind='session_summary',
+        session=session,
+        status__in=ACTIVE_STATUSES
+    ).first()
+    if job:
+        return job
+    return AIJob.objects.create(kind='session_summary', session=session, requested_by=user, force=force)
+
+
+def stale_summary_ids(sessions, chunk_size=500):
+    """Ids of sessions whose stored summary no longer matches their step data"""
+    fields = ['id', 'ai_summary', 'ai_summary_hash'] + OnboardingSession.STEP_FIELDS
+    for session in sessions.only(*fields).iterator(chunk_size=chunk_size):
+        if not is_summary_current(session):
+            yield session.id
+
+
+def enqueue_submitted_summaries(missing_only=False, stale_only=False):
+    """
+    Queue a summary for every submitted session without an active job.
+    missing_only skips sessions that have a summary; stale_only skips those
+    whose summary was generated from their current data. Returns the number queued.
+    """
+    sessions = OnboardingSession.objects.filter(status='submitted').exclude(
+        ai_jobs__kind='session_summary',
+        ai_jobs__status__in=ACTIVE_STATUSES
+    )
+    if missing_only:
+        sessions = sessions.filter(ai_summary='')
+    if stale_only:
+        session_ids = list(stale_summary_ids(sessions))
+    else:
+        session_ids = list(sessions.values_list('id', flat=True))
+    AIJob.objects.bulk_create(
+        [AIJob(kind='session_summary', session_id=session_id) for session_id in session_ids],
+        batch_size=500
+    )
+    return len(session_ids)
+
+
+def claim_next(worker):
+    """Mark the oldest due queued job as running for this worker and return it (None if none is due)"""
+    while True:
+        due = Q(run_after__isnull=True) | Q(run_after__lte=timezone.now())
+        candidates = list(
+            AIJob.objects.filter(due, status='queued').order_by('created_at', 'id').values_list('id', flat=True)[:CLAIM_BATCH]
+        )
+        if not candidates:
+            return None
+        for job_id in candidates:
+            claimed = AIJob.objects.filter(id=job_id, status='queued').update(
+                status='running',
+                worker=worker,
+                attempts=F('attempts') + 1,
+                started_at=timezone.now()
+            )
+            if claimed:
+                return AIJob.objects.select_related('session').get(id=job_id)
+        # Every candidate was taken by another worker; look again
+
+
+def requeue_stale(max_age):
+    """Requeue jobs left running longer than max_age seconds (e.g. by a killed worker)"""
+    stale = AIJob.objects.filter(
+        status='running',
+        started_at__lt=timezone.now() - timedelta(seconds=max_age)
+    )
+    failed = stale.filter(attempts__gte=get_max_attempts()).update(
+        status='failed',
+        error='Worker stopped before the job finished',
+        finished_at=timezone.now()
+    )
+    requeued = stale.update(status='queued', worker='')
+    return requeued, failed
+
+
+def _run_summary(job):
+    # Finishes instantly when the stored summary is already current
+    summary, _ = get_or_generate_summary(job.session, force=job.force)
+    return summary
+
+
+def _run_client_reconcile(job):
+    client = reconcile_session_client(job.session)
+    return f'Client #{client.id}' if client else 'meet_you has no email and name; nothing to link'
+
+
+JOB_RUNNERS = {
+    'session_summary': _run_summary,
+    'client_reconcile': _run_client_reconcile,
+}
+
+
+def run_job(job):
+    """
+    Run a claimed job and record its outcome. Failed jobs are retried up to
+    AI_JOB_MAX_ATTEMPTS times, each after an exponentially longer delay.
+    """
+    try:
+        result = JOB_RUNNERS[job.kind](job)
+    except Exception as e:
+        job.error = str(e)
+        if job.attempts < get_max_attempts():
+            job.status = 'queued'
+            job.worker = ''
+            job.run_after = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        else:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'worker', 'finished_at', 'run_after'])
+        return False
+
+    job.status = 'done'
+    job.result = result
+    job.error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return True
+
+
+def job_payload(job):
+    """JSON-serializable status of a job for polling clients"""
+    payload = {
+        'job_id': job.id,
+        'kind': job.kind,
+        'session_id': job.session_id,
+        'status': job.status,
+        'attempts': job.attempts,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == 'queued' and job.run_after:
+        payload['retry_at'] = job.run_after.isoformat()
+    if job.status == 'done':
+        payload['summary' if job.kind == 'session_summary' else 'result'] = job.result
+    elif job.error:
+        payload['error'] = job.error
+    return payload
@@ -0,0 +1,245 @@
+"""
+Autosave Buffer - Write-behind buffering for onboarding autosaves
+
+Non-submit saves are merged into a per-session entry in Django's cache and
+acknowledged immediately. The coalesced changes are written to
+OnboardingSession once the entry is older than
+ONBOARDING_AUTOSAVE_BUFFER_SECONDS, on submit / "save & exit", or by the
+`flush_onboarding_autosaves` management command.
+
+Buffered changes are written with the same conditional revision check as
+delta saves: if the session was saved directly after the changes were
+buffered, they are dropped (and the autosave that tried to write them gets
+a 409) instead of overwriting the newer data.
+
+Requires a cache shared by all workers (REDIS_URL): with a per-process
+cache the flush command could never see the buffered entries, so
+buffering stays off (and `manage.py check` warns) until one is configured.
+Pending sessions are tracked in a Redis sorted set (member: session_id,
+score: time of the oldest unflushed change), so autosaves never contend
+on a shared index; other shared backends fall back to a locked dict.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.utils import timezone
+
+from .models import OnboardingSession
+from .utils.cache_utils import is_shared_cache
+from .client_helpers import meet_you_identity, request_client_reconcile
+from .onboarding_helpers import apply_step_changes
+
+BUFFER_KEY = 'onboarding_autosave:{session_id}'
+LOCK_KEY = 'onboarding_autosave:lock:{name}'
+PENDING_KEY = 'onboarding_autosave:pending'
+BUFFER_TIMEOUT = 60 * 60 * 24  # Idle entries are dropped after a day (pending ones are flushed first)
+LOCK_TIMEOUT = 5
+
+logger = logging.getLogger(__name__)
+
+
+class BufferConflict(Exception):
+    """Raised when a delta save is based on a stale revision"""
+    def __init__(self, revision):
+        super().__init__('Session was changed elsewhere; reload before saving')
+        self.revision = revision
+
+
+def get_buffer_interval():
+    """Seconds to hold autosaves before writing them; 0 disables buffering"""
+    return getattr(settings, 'ONBOARDING_AUTOSAVE_BUFFER_SECONDS', 0)
+
+
+def is_enabled():
+    """Buffering needs an interval and a cache every process (including the flush cron) can see"""
+    return get_buffer_interval() > 0 and is_shared_cache()
+
+
+@contextmanager
+def _lock(name):
+    """Short-lived mutex built on cache.add (atomic on all Django backends)"""
+    key = LOCK_KEY.format(name=name)
+    deadline = time.monotonic() + LOCK_TIMEOUT * 2
+    while not cache.add(key, 1, LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            raise RuntimeError(f'Could not acquire autosave lock for {name}')
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        cache.delete(key)
+
+
+def _pending_redis():
+    """Raw client for the Redis pending index, or None when the cache is not Redis"""
+    backend = caches['default']  # `cache` is a proxy, so check the backend itself
+    if isinstance(backend, RedisCache):
+        return backend._cache.get_client(write=True)
+    return None
+
+
+def _mark_pending(session_id, since):
+    client = _pending_redis()
+    if client is not None:
+        # NX keeps the time of the oldest unflushed change
+        client.zadd(cache.make_key(PENDING_KEY), {session_id: since}, nx=True)
+        return
+    with _lock('pending'):
+        pending = cache.get(PENDING_KEY) or {}
+        pending.setdefault(session_id, since)
+        cache.set(PENDING_KEY, pending, None)
+
+
+def _clear_pending(session_id):
+    client = _pending_redis()
+    if client is not None:
+        client.zrem(cache.make_key(PENDING_KEY), session_id)
+        return
+    with _lock('pending'):
+        pending = cache.get(PENDING_KEY) or {}
+        if pending.pop(session_id, None) is not None:
+            cache.set(PENDING_KEY, pending, None)
+
+
+def get_pending(max_since=None):
+    """Map of session_id -> time of the oldest unflushed change (only those at or before max_since if given)"""
+    client = _pending_redis()
+    if client is not None:
+        members = client.zrangebyscore(
+            cache.make_key(PENDING_KEY), '-inf', '+inf' if max_since is None else max_since, withscores=True
+        )
+        return {member.decode(): since for member, since in members}
+    pending = dict(cache.get(PENDING_KEY) or {})
+    if max_since is not None:
+        pending = {session_id: since for session_id, since in pending.items() if since <= max_since}
+    return pending
+
+
+def buffer_changes(session_id, changes, base_revision=None, force_flush=False):
+    """
+    Merge changes into the buffered entry for this session.
+    `base_revision` is checked for delta saves (None for full saves).
+    Returns the entry dict (with 'revision' and 'flushed'), or None if the
+    session is not in the database yet and must be saved directly.
+    Raises BufferConflict if a flush found the session changed in the
+    database since its changes were buffered (they are dropped).
+    """
+    for path in changes:
+        if str(path).partition('.')[0] not in OnboardingSession.STEP_FIELDS:
+            raise ValueError(f'Unknown step: {str(path).partition(".")[0]}')
+    
+    key = BUFFER_KEY.format(session_id=session_id)
+    with _lock(session_id):
+        entry = cache.get(key)
+        if entry is None or not entry['changes']:
+            # Nothing buffered: start from the database revision, which a direct save may have moved
+            revision = OnboardingSession.objects.filter(
+                session_id=session_id
+            ).values_list('revision', flat=True).first()
+            if revision is None:
+                return None
+            entry = {'changes': {}, 'revision': revision, 'base_revision': revision, 'since': None}
+
+        if base_revision is not None and base_revision != entry['revision']:
+            raise BufferConflict(entry['revision'])
+
+        now = time.time()
+        if changes:
+            for path, value in changes.items():
+                # Re-insert so later changes are applied after earlier ones
+                entry['changes'].pop(path, None)
+                entry['changes'][path] = value
+            entry['revision'] += 1
+            if entry['since'] is None:
+                entry['since'] = now
+        elif entry['since'] is None:
+            # Nothing buffered and nothing new
+            cache.set(key, entry, BUFFER_TIMEOUT)
+            entry['flushed'] = False
+            return entry
+
+        due = force_flush or now - entry['since'] >= get_buffer_interval()
+        written = _write(session_id, entry) if due else True
+        cache.set(key, entry, BUFFER_TIMEOUT)
+
+    if due:
+        _clear_pending(session_id)
+    else:
+        _mark_pending(session_id, entry['since'])
+    if not written:
+        raise BufferConflict(entry['revision'])
+    entry['flushed'] = due
+    return entry
+
+
+def _write(session_id, entry):
+    """
+    Write a buffered entry's coalesced changes to the database (caller
+    holds the lock), only if the session is still at the revision they
+    were buffered on. Returns False if they were dropped as a conflict.
+    """
+    written = True
+    if entry['changes']:
+        session = OnboardingSession.objects.filter(session_id=session_id).first()
+        if session:
+            written = session.revision == entry['base_revision']
+            if written:
+                previous_identity = meet_you_identity(session.meet_you)
+                touched_steps, update_fields = apply_step_changes(session, entry['changes'])
+                values = {field: getattr(session, field) for field in dict.fromkeys(update_fields)}
+                values['revision'] = entry['revision']
+                values['updated_at'] = timezone.now()
+                # Conditional write: only succeeds if nobody saved since base_revision
+                written = bool(OnboardingSession.objects.filter(
+                    pk=session.pk, revision=entry['base_revision']
+                ).update(**values))
+            if written:
+                request_client_reconcile(session, previous_identity)
+            else:
+                logger.warning(
+                    '[KaTek] Dropped buffered autosave for session %s: saved elsewhere since revision %s',
+                    session_id, entry['base_revision']
+                )
+                entry['revision'] = OnboardingSession.objects.filter(
+                    pk=session.pk
+                ).values_list('revision', flat=True).first()
+    entry['changes'] = {}
+    entry['since'] = None
+    entry['base_revision'] = entry['revision']
+    return written
+
+
+def flush(session_id, discard=False):
+    """
+    Write any buffered changes for a session to the database.
+    With discard=True the entry is removed afterwards, so the next
+    buffered save re-reads the revision (use before direct writes).
+    Returns False if the changes conflicted with a direct save and were dropped.
+    """
+    key = BUFFER_KEY.format(session_id=session_id)
+    written = True
+    with _lock(session_id):
+        entry = cache.get(key)
+        if entry is not None:
+            written = _write(session_id, entry)
+            if discard:
+                cache.delete(key)
+            else:
+                cache.set(key, entry, BUFFER_TIMEOUT)
+    _clear_pending(session_id)
+    return written
+
+
+def flush_due(max_age=None):
+    """Flush every pending session older than max_age seconds (defaults to the buffer interval)"""
+    if max_age is None:
+        max_age = get_buffer_interval()
+    flushed = []
+    for session_id in get_pending(max_since=time.time() - max_age):
+        flush(session_id)
+        flushed.append(session_id)
+    return flushed
@@ -0,0 +1,96 @@
+"""
+Blueprint Export - Bulk export of sessions with all twelve onboarding steps
+
+Rows are read from the database in server-side chunks and written out
+incrementally, so memory stays flat regardless of how many sessions are
+exported. Supports an `updated_since` watermark for incremental exports.
+"""
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import OnboardingSession
+from .onboarding_helpers import flatten_steps
+
+# Scalar columns exported alongside the step data
+BLUEPRINT_SCALAR_COLUMNS = [
+    'id', 'session_id', 'status', 'course_title', 'audience_summary',
+    'main_outcomes', 'level', 'access_model', 'steps_completed',
+    'client__full_name', 'client__email', 'assignee__username',
+    'created_at', 'updated_at', 'submitted_at',
+]
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+def get_export_queryset(updated_since=None, status=None):
+    """Sessions to export, oldest change first so the last row is the new watermark"""
+    sessions = OnboardingSession.objects.all()
+    if updated_since:
+        sessions = sessions.filter(updated_at__gt=updated_since)
+    if status:
+        sessions = sessions.filter(status=status)
+    return sessions.order_by('updated_at', 'id')
+
+
+def iter_blueprint_records(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield (scalars, steps) per session, reading only the exported columns in chunks"""
+    columns = BLUEPRINT_SCALAR_COLUMNS + OnboardingSession.STEP_FIELDS
+    for row in queryset.values(*columns).iterator(chunk_size=chunk_size):
+        scalars = {column.replace('__', '_'): row[column] for column in BLUEPRINT_SCALAR_COLUMNS}
+        steps = {step: row[step] if isinstance(row[step], dict) else {} for step in OnboardingSession.STEP_FIELDS}
+        yield scalars, steps
+
+
+def iter_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one JSON line per session with flattened step data"""
+    for scalars, steps in iter_blueprint_records(queryset, chunk_size=chunk_size):
+        row = dict(scalars)
+        row.update(flatten_steps(steps))
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def write_parquet(queryset, path, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Write sessions to a Parquet file, one row group per chunk.
+    Step data is stored as one JSON text column per step so the schema is
+    fixed. Requires pyarrow. Returns the number of rows written.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError('Parquet export requires pyarrow (pip install -r requirements.txt)')
+    
+    names = [column.replace('__', '_') for column in BLUEPRINT_SCALAR_COLUMNS] + OnboardingSession.STEP_FIELDS
+    integer_columns = {'id', 'steps_completed'}
+    datetime_columns = {'created_at', 'updated_at', 'submitted_at'}
+    schema = pa.schema([
+        (name, pa.int64() if name in integer_columns
+         else pa.timestamp('us', tz='UTC') if name in datetime_columns
+         else pa.string())
+        for name in names
+    ])
+    
+    total = 0
+    batch = []
+    with pq.ParquetWriter(path, schema) as writer:
+        for scalars, steps in iter_blueprint_records(queryset, chunk_size=chunk_size):
+            row = dict(scalars)
+            for step, data in steps.items():
+                row[step] = json.dumps(data, cls=DjangoJSONEncoder)
+            batch.append(row)
+            total += 1
+            if len(batch) >= chunk_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    return total
+
+
+def latest_watermark(queryset):
+    """updated_at of the most recently changed session in the queryset (the next watermark)"""
+    latest = queryset.order_by('-updated_at').values_list('updated_at', flat=True).first()
+    return latest.isoformat() if isinstance(latest, datetime) else None
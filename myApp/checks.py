@@ -0,0 +1,19 @@
+"""
+System checks for settings that only work with a particular deployment
+"""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from .utils.cache_utils import is_shared_cache
+
+
+@register(Tags.caches)
+def check_autosave_buffer_cache(app_configs, **kwargs):
+    if getattr(settings, 'ONBOARDING_AUTOSAVE_BUFFER_SECONDS', 0) > 0 and not is_shared_cache():
+        return [Warning(
+            'ONBOARDING_AUTOSAVE_BUFFER_SECONDS is set but the default cache is private to each process; '
+            'autosave buffering stays disabled.',
+            hint='Set REDIS_URL so web workers and flush_onboarding_autosaves share the buffer.',
+            id='myApp.W001',
+        )]
+    return []
@@ -0,0 +1,89 @@
+"""
+Client Helpers - Resolve onboarding answers to one Client per person
+
+A session's Client is derived from its meet_you answers. Resolution goes
+through the unique Client.email_normalized index with update_or_create,
+so repeating it (or running it from several processes) never creates a
+second Client for the same email. Saves only request a reconcile when
+the meet_you email or name actually changed; the reconcile is queued for
+`python manage.py run_ai_worker` when CLIENT_RECONCILE_QUEUED is set (it
+follows AI_JOB_QUEUE_ENABLED) and otherwise runs inline after the save.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import AIJob, Client
+
+logger = logging.getLogger(__name__)
+
+# meet_you answers copied onto the Client when they are filled in
+CLIENT_DETAIL_FIELDS = ['brand_name', 'phone', 'website']
+
+
+def meet_you_identity(step_data):
+    """(normalized email, full name) from meet_you answers, or None until both are filled in"""
+    if not isinstance(step_data, dict):
+        return None
+    email = Client.normalize_email(step_data.get('email'))
+    full_name = (step_data.get('full_name') or '').strip()
+    if not (email and full_name):
+        return None
+    return email, full_name
+
+
+def resolve_client(step_data):
+    """Create or update the Client for meet_you answers (None if email or name is missing)"""
+    identity = meet_you_identity(step_data)
+    if identity is None:
+        return None
+    email_normalized, full_name = identity
+    details = {field: step_data.get(field) or '' for field in CLIENT_DETAIL_FIELDS}
+    client, _ = Client.objects.update_or_create(
+        email_normalized=email_normalized,
+        # Blank answers never wipe what the Client already has
+        defaults={'full_name': full_name, **{field: value for field, value in details.items() if value}},
+        create_defaults={'email': step_data['email'].strip(), 'full_name': full_name, **details},
+    )
+    return client
+
+
+def reconcile_session_client(session):
+    """Attach the Client the session's meet_you answers resolve to. Safe to repeat; returns the Client."""
+    client = resolve_client(session.meet_you)
+    if client and session.client_id != client.id:
+        session.client = client
+        session.save(update_fields=['client'])
+    return client
+
+
+def enqueue_client_reconcile(session):
+    """
+    Queue a reconcile for the session, reusing one that is still queued.
+    A running job may have read the old answers, so it is not reused.
+    """
+    job = AIJob.objects.filter(kind='client_reconcile', session=session, status='queued').first()
+    if job:
+        return job
+    return AIJob.objects.create(kind='client_reconcile', session=session)
+
+
+def request_client_reconcile(session, previous_identity):
+    """
+    Call after saving a session: reconciles its Client when the meet_you
+    identity differs from `previous_identity` (meet_you_identity before the
+    save). Returns True if a reconcile was run or queued.
+    """
+    identity = meet_you_identity(session.meet_you)
+    if identity is None or identity == previous_identity:
+        return False
+    if getattr(settings, 'CLIENT_RECONCILE_QUEUED', getattr(settings, 'AI_JOB_QUEUE_ENABLED', False)):
+        transaction.on_commit(lambda: enqueue_client_reconcile(session))
+        return True
+    try:
+        reconcile_session_client(session)
+    except Exception as e:
+        # The session itself is saved; `python manage.py link_clients` picks this up later
+        logger.exception('[KaTek] Client reconcile failed for session %s: %s', session.session_id, e)
+    return True
@@ -1,9 +1,75 @@
 """
 Content Helpers - Convert database models to template context
 """
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
 from .models import (
     SEO, WebsiteHero, WebsiteSection, WebsiteTestimonial, WebsiteFooter
 )
+from .utils.cache_utils import is_shared_cache
+
+# Cache keys for the homepage content snapshot
+CONTENT_VERSION_KEY = 'website_content:version'
+CONTENT_SNAPSHOT_KEY = 'website_content:snapshot:{version}'
+CONTENT_SNAPSHOT_TIMEOUT = 60 * 60 * 24  # Old versions simply expire
+HOMEPAGE_HTML_KEY = 'website_content:homepage_html:{version}'
+
+
+def get_content_cache_timeout():
+    """
+    Lifetime of the version and snapshot entries. With a per-process cache
+    (LocMemCache) a bump only reaches the worker that handled the edit, so
+    the others must re-read the database after CONTENT_LOCAL_CACHE_SECONDS.
+    """
+    if is_shared_cache():
+        return None
+    return getattr(settings, 'CONTENT_LOCAL_CACHE_SECONDS', 30)
+
+
+def get_content_version():
+    """
+    Current homepage content version.
+    The version is a microsecond timestamp so it never repeats, even if the
+    cache entry is evicted and has to be re-created.
+    """
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        cache.add(CONTENT_VERSION_KEY, time.time_ns() // 1000, get_content_cache_timeout())
+        version = cache.get(CONTENT_VERSION_KEY)
+    return version
+
+
+def bump_content_version():
+    """Invalidate the homepage content snapshot (called from model signals)"""
+    version = time.time_ns() // 1000
+    cache.set(CONTENT_VERSION_KEY, version, get_content_cache_timeout())
+    return version
+
+
+def get_content_etag(version):
+    """Strong ETag for the homepage rendered at the given content version"""
+    return f'"home-{version}"'
+
+
+def get_content_last_modified(version):
+    """Last-Modified timestamp (seconds) for the given content version"""
+    return version // 1_000_000
+
+
+def get_website_content():
+    """
+    Get homepage content from the versioned cache snapshot.
+    Only hits the database when the content version has changed.
+    """
+    key = CONTENT_SNAPSHOT_KEY.format(version=get_content_version())
+    content = cache.get(key)
+    if content is None:
+        content = get_website_content_from_db()
+        cache.set(key, content, get_content_cache_timeout() or CONTENT_SNAPSHOT_TIMEOUT)
+    return content
 
 
 def get_website_content_from_db():
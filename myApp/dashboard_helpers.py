@@ -0,0 +1,126 @@
+"""
+Dashboard Helpers - Aggregated metrics for the course blueprint dashboard
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import OnboardingSession
+
+DASHBOARD_KPIS_KEY = 'dashboard:kpis'
+
+# Statuses shown in the overview pipeline
+PIPELINE_STATUSES = ['new', 'in_review', 'needs_clarification', 'approved', 'in_production', 'completed']
+
+
+def get_dashboard_kpis_from_db():
+    """
+    Compute every overview count in a single conditional-aggregate query.
+    Returns status counts plus the derived attention metrics.
+    """
+    now = timezone.now()
+    aggregates = {
+        status: Count('id', filter=Q(status=status))
+        for status in PIPELINE_STATUSES
+    }
+    aggregates['new_this_week'] = Count('id', filter=Q(created_at__gte=now - timedelta(days=7)))
+    aggregates['old_review_sessions'] = Count('id', filter=Q(
+        status='in_review',
+        updated_at__lt=now - timedelta(days=3)
+    ))
+    aggregates['incomplete_sessions'] = Count('id', filter=(
+        Q(course_title='') | Q(course_title__isnull=True) |
+        Q(audience_summary='') | Q(main_outcomes='')
+    ))
+    counts = OnboardingSession.objects.aggregate(**aggregates)
+    
+    return {
+        'pipeline': {status: counts[status] for status in PIPELINE_STATUSES},
+        'new_this_week': counts['new_this_week'],
+        'old_review_sessions': counts['old_review_sessions'],
+        'incomplete_sessions': counts['incomplete_sessions'],
+    }
+
+
+def get_dashboard_kpis():
+    """Overview counts from a short-TTL cache (invalidated on status changes)"""
+    kpis = cache.get(DASHBOARD_KPIS_KEY)
+    if kpis is None:
+        kpis = get_dashboard_kpis_from_db()
+        cache.set(DASHBOARD_KPIS_KEY, kpis, getattr(settings, 'DASHBOARD_KPIS_CACHE_SECONDS', 30))
+    return kpis
+
+
+def invalidate_dashboard_kpis():
+    """Drop cached overview counts (called when a session is created or changes status)"""
+    cache.delete(DASHBOARD_KPIS_KEY)
+
+
+# ==================== KEYSET PAGINATION ====================
+
+# Sort keys allowed for session listings (each backed by a (field, id) index)
+SESSION_SORT_KEYS = ['created_at', 'updated_at', 'status', 'steps_completed']
+CURSOR_SALT = 'dashboard.sessions.cursor'
+
+
+def parse_sort(sort, default='-created_at'):
+    """Validate a sort parameter like '-updated_at' against SESSION_SORT_KEYS"""
+    if sort and sort.lstrip('-') in SESSION_SORT_KEYS:
+        return sort
+    return default
+
+
+def encode_cursor(sort, value, pk):
+    """Opaque, signed cursor pointing just past (value, pk) for the given sort"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return signing.dumps({'s': sort, 'v': value, 'id': pk}, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor, sort):
+    """Returns (value, pk) from a cursor, or raises ValueError if it is invalid or for another sort"""
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise ValueError('Invalid cursor')
+    if data.get('s') != sort:
+        raise ValueError('Cursor does not match sort order')
+    value = data.get('v')
+    if sort.lstrip('-') in ('created_at', 'updated_at'):
+        value = parse_datetime(value) if value else None
+        if value is None:
+            raise ValueError('Invalid cursor')
+    return value, data.get('id')
+
+
+def keyset_page(queryset, sort, cursor=None, limit=25):
+    """
+    Fetch one page of `queryset` ordered by `sort` with an id tie-breaker.
+    Each page costs the same regardless of depth: the cursor becomes a
+    WHERE on (field, id) instead of an OFFSET.
+    Returns (rows, next_cursor).
+    """
+    field = sort.lstrip('-')
+    descending = sort.startswith('-')
+    id_order = '-id' if descending else 'id'
+    queryset = queryset.order_by(sort, id_order)
+    
+    if cursor:
+        value, pk = decode_cursor(cursor, sort)
+        if descending:
+            queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}))
+        else:
+            queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}))
+    
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, field), last.pk)
+    return rows, next_cursor
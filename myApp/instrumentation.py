@@ -0,0 +1,235 @@
+"""
+Instrumentation - Per-request query count and latency metrics
+
+RequestMetricsMiddleware records, for every request, the number of SQL
+queries and the time spent in the database, in template rendering and in
+total; it is off unless REQUEST_METRICS_ENABLED=True. The latest
+REQUEST_METRICS_BUFFER_SIZE requests are kept in an in-process ring
+buffer (per worker process, cleared on restart), served as JSON to
+staff by dashboard_request_metrics. Requests whose query count
+or repeated query shape (N+1) passes the configured thresholds, and GETs
+that write to the database, are logged by URL name.
+
+The middleware is sync and async capable, so under ASGI async views keep
+running on the server's event loop. Queries are counted by one execute
+wrapper per database connection that records into the metrics of the
+request in the current context (sync_to_async carries it into the ORM
+thread). Template time comes from the InstrumentedDjangoTemplates
+backend, which settings only install when metrics are enabled. The body
+of a streaming response is produced after the middleware returns, so its
+queries are not counted.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_buffer = deque(maxlen=getattr(settings, 'REQUEST_METRICS_BUFFER_SIZE', 500))
+_buffer_lock = threading.Lock()
+# Metrics of the request being handled in this thread / task
+_current = ContextVar('request_metrics', default=None)
+
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+WRITE_RE = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE)\b', re.IGNORECASE)
+# Literals that differ between otherwise identical queries
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r'\bIN \((?:\s*(?:%s|\?),?)+\)', re.IGNORECASE)
+
+
+def query_shape(sql):
+    """SQL with literals and IN lists collapsed, so per-row repeats compare equal"""
+    return IN_LIST_RE.sub('IN (...)', LITERAL_RE.sub('?', sql))
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        # Outside a request (management commands, the worker)
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics['db_time'] += time.perf_counter() - start
+        metrics['queries'] += 1
+        metrics['shapes'][query_shape(sql)] += 1
+        if WRITE_RE.match(sql):
+            metrics['writes'] += 1
+
+
+class TimedTemplate:
+    """Wraps a backend Template to add its render time to the current request's metrics"""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None or metrics['template_depth']:
+            # Outside a request, or nested inside a render that is already timed
+            return self.template.render(context, request)
+        metrics['template_depth'] += 1
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics['template_time'] += time.perf_counter() - start
+            metrics['template_depth'] -= 1
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend whose templates report their render time"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def _instrument_connection(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _new_metrics():
+    return {
+        'queries': 0, 'writes': 0, 'db_time': 0.0,
+        'template_time': 0.0, 'template_depth': 0, 'shapes': Counter(),
+    }
+
+
+class RequestMetricsMiddleware:
+    """Records query count, DB time, template time and latency per request (see module docstring)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(_instrument_connection, dispatch_uid='request_metrics_queries')
+        for conn in connections.all(initialized_only=True):
+            _instrument_connection(conn)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = _new_metrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = _new_metrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    def finish(self, request, response, metrics, duration):
+        entry = self.record(request, response, metrics, duration)
+        if getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', False):
+            response['Server-Timing'] = (
+                f'db;dur={entry["db_ms"]};desc="{entry["queries"]} queries", '
+                f'tpl;dur={entry["template_ms"]}, total;dur={entry["duration_ms"]}'
+            )
+        return response
+
+    def record(self, request, response, metrics, duration):
+        match = request.resolver_match
+        repeated_sql, repeated = metrics['shapes'].most_common(1)[0] if metrics['shapes'] else ('', 0)
+        entry = {
+            'time': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'db_ms': round(metrics['db_time'] * 1000, 1),
+            'template_ms': round(metrics['template_time'] * 1000, 1),
+            'queries': metrics['queries'],
+            'writes': metrics['writes'],
+            'max_repeated_query': repeated,
+        }
+        with _buffer_lock:
+            _buffer.append(entry)
+
+        label = entry['view'] or request.path
+        query_threshold = getattr(settings, 'REQUEST_METRICS_QUERY_THRESHOLD', 30)
+        repeat_threshold = getattr(settings, 'REQUEST_METRICS_REPEAT_THRESHOLD', 5)
+        if repeated >= repeat_threshold:
+            logger.warning(
+                '[KaTek] Possible N+1 in %s: same query ran %d times (%d queries total): %s',
+                label, repeated, entry['queries'], repeated_sql[:300]
+            )
+        elif entry['queries'] >= query_threshold:
+            logger.warning('[KaTek] %s ran %d queries (%.1f ms in the database)', label, entry['queries'], entry['db_ms'])
+        if entry['writes'] and request.method in SAFE_METHODS:
+            logger.warning('[KaTek] %s %s wrote to the database (%d write queries)', request.method, label, entry['writes'])
+        return entry
+
+
+def recent_requests(limit=None, view=None):
+    """Newest-first buffered request metrics, optionally for one URL name"""
+    with _buffer_lock:
+        entries = list(_buffer)
+    entries.reverse()
+    if view:
+        entries = [entry for entry in entries if entry['view'] == view]
+    return entries[:limit] if limit else entries
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize_by_view(entries):
+    """Per-URL-name request count, latency (avg/p95/max) and average query, DB and template cost"""
+    groups = defaultdict(list)
+    for entry in entries:
+        groups[entry['view'] or entry['path']].append(entry)
+
+    summary = []
+    for view, rows in groups.items():
+        count = len(rows)
+        durations = [row['duration_ms'] for row in rows]
+        summary.append({
+            'view': view,
+            'requests': count,
+            'avg_ms': round(sum(durations) / count, 1),
+            'p95_ms': _percentile(durations, 0.95),
+            'max_ms': max(durations),
+            'avg_queries': round(sum(row['queries'] for row in rows) / count, 1),
+            'max_queries': max(row['queries'] for row in rows),
+            'avg_db_ms': round(sum(row['db_ms'] for row in rows) / count, 1),
+            'avg_template_ms': round(sum(row['template_ms'] for row in rows) / count, 1),
+            'writes_on_get': sum(1 for row in rows if row['writes'] and row['method'] in SAFE_METHODS),
+        })
+    summary.sort(key=lambda row: row['avg_ms'] * row['requests'], reverse=True)
+    return summary
@@ -0,0 +1,190 @@
+"""
+Management command to benchmark smart_compress_to_bytes against the previous implementation
+Each implementation runs in its own process so peak RSS is measured separately.
+Run: python manage.py benchmark_compression --images 4 --width 6000 --height 4000
+"""
+import io
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import tempfile
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+
+def legacy_smart_compress_to_bytes(image_file, target_bytes, max_quality=95, min_quality=60):
+    """The previous implementation (linear quality walk), kept as the benchmark baseline"""
+    try:
+        # Open image
+        img = Image.open(image_file)
+        
+        # Convert RGBA to RGB if needed (for JPEG compatibility)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+            img = background
+        
+        # Get original size
+        original_size = len(image_file.read()) if hasattr(image_file, 'read') else 0
+        image_file.seek(0) if hasattr(image_file, 'seek') else None
+        
+        # If already small enough, return as-is
+        if original_size <= target_bytes:
+            image_file.seek(0) if hasattr(image_file, 'seek') else None
+            return image_file.read() if hasattr(image_file, 'read') else image_file
+        
+        # Try different quality levels
+        quality = max_quality
+        output = io.BytesIO()
+        
+        while quality >= min_quality:
+            output.seek(0)
+            output.truncate(0)
+            
+            # Save with current quality
+            img.save(output, format='JPEG', quality=quality, optimize=True)
+            
+            # Check size
+            size = output.tell()
+            if size <= target_bytes:
+                output.seek(0)
+                return output.read()
+            
+            # Reduce quality for next iteration
+            quality -= 5
+        
+        # If still too large, try resizing
+        if output.tell() > target_bytes:
+            # Calculate resize factor
+            current_size = output.tell()
+            resize_factor = (target_bytes / current_size) ** 0.5
+            new_width = int(img.width * resize_factor)
+            new_height = int(img.height * resize_factor)
+            
+            # Resize image
+            img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            
+            # Save resized image
+            output.seek(0)
+            output.truncate(0)
+            img_resized.save(output, format='JPEG', quality=min_quality, optimize=True)
+            output.seek(0)
+            return output.read()
+        
+        # Fallback: return what we have
+        output.seek(0)
+        return output.read()
+    
+    except Exception as e:
+        # If compression fails, return original
+        print(f"Compression error: {e}")
+        if hasattr(image_file, 'seek'):
+            image_file.seek(0)
+        if hasattr(image_file, 'read'):
+            return image_file.read()
+        return image_file
+
+
+def get_implementations():
+    # Imported lazily: spawned children must load settings before cloudinary
+    from myApp.utils.cloudinary_utils import smart_compress_to_bytes
+    return {
+        'before': legacy_smart_compress_to_bytes,
+        'after': smart_compress_to_bytes,
+    }
+
+
+def make_test_jpeg(path, width, height, seed, quality=98):
+    """Write a noisy photo-sized JPEG (noise keeps it large at every quality)"""
+    rng = random.Random(seed)
+    img = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    noise = Image.frombytes('RGB', (width, height), rng.randbytes(width * height * 3))
+    Image.blend(img, noise, 0.6).save(path, format='JPEG', quality=quality)
+
+
+def _run_implementation(name, paths, target_bytes, results):
+    """Child process: compress every image, counting JPEG encodes via Image.save"""
+    django.setup()
+    compress = get_implementations()[name]
+    encodes = 0
+    original_save = Image.Image.save
+
+    def counting_save(self, fp, format=None, **params):
+        nonlocal encodes
+        encodes += 1
+        return original_save(self, fp, format, **params)
+
+    Image.Image.save = counting_save
+    rows = []
+    for path in paths:
+        encodes = 0
+        started = time.perf_counter()
+        with open(path, 'rb') as f:
+            data = compress(f, target_bytes=target_bytes)
+        rows.append({
+            'seconds': time.perf_counter() - started,
+            'encodes': encodes,
+            'output_bytes': len(data),
+        })
+    # ru_maxrss is in kilobytes on Linux
+    results.put((name, rows, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+class Command(BaseCommand):
+    help = 'Compare encodes per image, wall time and peak RSS of the old and new image compression'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=int, default=4)
+        parser.add_argument('--width', type=int, default=6000)
+        parser.add_argument('--height', type=int, default=4000)
+        parser.add_argument('--target-bytes', type=int, default=None,
+                            help='Compression target (defaults to the upload target)')
+
+    def handle(self, *args, **options):
+        from myApp.utils.cloudinary_utils import TARGET_BYTES
+        target_bytes = options['target_bytes'] or TARGET_BYTES
+        context = multiprocessing.get_context('spawn')
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for index in range(options['images']):
+                path = os.path.join(directory, f'bench_{index}.jpg')
+                make_test_jpeg(path, options['width'], options['height'], index)
+                paths.append(path)
+            source_mb = sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+            self.stdout.write(
+                f"{len(paths)} synthetic {options['width']}x{options['height']} JPEGs, "
+                f"{source_mb:.1f} MB total, target {target_bytes / (1024 * 1024):.1f} MB"
+            )
+
+            for name in get_implementations():
+                results = context.Queue()
+                process = context.Process(
+                    target=_run_implementation,
+                    args=(name, paths, target_bytes, results)
+                )
+                process.start()
+                while True:
+                    try:
+                        name, rows, peak_rss_mb = results.get(timeout=1)
+                        break
+                    except queue.Empty:
+                        if not process.is_alive():
+                            raise CommandError(f'Benchmark process for {name!r} exited with code {process.exitcode}')
+                process.join()
+
+                total = sum(row['seconds'] for row in rows)
+                encodes = sum(row['encodes'] for row in rows) / len(rows)
+                output_mb = sum(row['output_bytes'] for row in rows) / (1024 * 1024)
+                self.stdout.write(
+                    f'{name:>6}: {total:.2f}s total, {total / len(rows):.2f}s/image, '
+                    f'{encodes:.1f} encodes/image, peak RSS {peak_rss_mb:.0f} MB, output {output_mb:.1f} MB'
+                )
+
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete'))
@@ -0,0 +1,73 @@
+"""
+Management command to benchmark the image upload pipeline against serial uploads
+Uses the local stub uploader, so nothing is sent to Cloudinary.
+Run: python manage.py benchmark_uploads --files 20 --latency 0.5
+"""
+import io
+import os
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from myApp.utils.cloudinary_utils import smart_compress_to_bytes, stub_upload_bytes
+from myApp.utils.upload_pipeline import iter_uploads, get_compress_pool
+
+
+def make_test_image(width, height, seed):
+    """PNG bytes of a noisy gradient (noise keeps it from compressing away)"""
+    rng = random.Random(seed)
+    img = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    noise = Image.frombytes('RGB', (width, height), rng.randbytes(width * height * 3))
+    img = Image.blend(img, noise, 0.35)
+    output = io.BytesIO()
+    img.save(output, format='PNG')
+    return output.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'Time serial vs concurrent image compression + upload with the stub uploader'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=20, help='Number of images to upload')
+        parser.add_argument('--width', type=int, default=2400)
+        parser.add_argument('--height', type=int, default=1600)
+        parser.add_argument('--latency', type=float, default=0.5, help='Simulated upload round trip in seconds')
+        parser.add_argument('--upload-workers', type=int, default=None)
+        parser.add_argument('--skip-serial', action='store_true')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Generating {options['files']} {options['width']}x{options['height']} test images...")
+        files = [
+            (f'bench_{index}.png', make_test_image(options['width'], options['height'], index))
+            for index in range(options['files'])
+        ]
+        total_mb = sum(len(data) for _, data in files) / (1024 * 1024)
+        self.stdout.write(f'{total_mb:.1f} MB of source images')
+
+        def uploader(data, folder, **kwargs):
+            time.sleep(options['latency'])
+            return stub_upload_bytes(data, folder=folder, **kwargs)
+
+        if not options['skip_serial']:
+            started = time.perf_counter()
+            for name, data in files:
+                uploader(smart_compress_to_bytes(io.BytesIO(data)), folder='benchmark')
+            serial = time.perf_counter() - started
+            self.stdout.write(f'Serial:     {serial:.2f}s ({len(files) / serial:.1f} files/s)')
+
+        # Warm the process pool so worker start-up isn't counted
+        pool = get_compress_pool()
+        if pool is not None:
+            list(pool.map(abs, range(os.cpu_count() or 1)))
+
+        started = time.perf_counter()
+        results = list(iter_uploads(files, folder='benchmark', uploader=uploader,
+                                    upload_workers=options['upload_workers']))
+        concurrent = time.perf_counter() - started
+        failed = sum(1 for result in results if not result.ok)
+        self.stdout.write(f'Concurrent: {concurrent:.2f}s ({len(files) / concurrent:.1f} files/s, {failed} failed)')
+
+        if not options['skip_serial']:
+            self.stdout.write(self.style.SUCCESS(f'✓ Speedup: {serial / concurrent:.1f}x'))
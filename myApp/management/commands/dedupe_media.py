@@ -0,0 +1,132 @@
+"""
+Management command to collapse duplicate MediaAsset rows within each folder
+Assets uploaded before content hashing are hashed from their stored image
+(--backfill), so duplicates among them are found too. Cloudinary stores a
+re-encoded copy, so those hashes never equal the hash of a file as uploaded:
+use --perceptual to also catch re-uploads of legacy images. A 64-bit dHash
+also matches images that are only similar (solid fills, crops of one
+template), so --perceptual only reports its groups until --apply is given.
+Run: python manage.py dedupe_media --backfill --dry-run
+     python manage.py dedupe_media --perceptual  (review), then --perceptual --apply
+"""
+import io
+import urllib.request
+from collections import defaultdict
+
+import cloudinary.uploader
+from django.core.management.base import BaseCommand
+from myApp.media_helpers import content_hash, collapse_duplicates
+from myApp.models import MediaAsset
+from myApp.utils.cloudinary_utils import analyze_image
+
+
+def _download(url, timeout=30):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+class Command(BaseCommand):
+    help = 'Merge MediaAssets with identical (or, with --perceptual, visually identical) images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='First download and hash assets that have no content hash yet',
+        )
+        parser.add_argument(
+            '--perceptual',
+            action='store_true',
+            help='Group by perceptual hash (re-encoded or resized copies) instead of exact bytes; '
+                 'report-only unless --apply is given',
+        )
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help='With --perceptual, merge the reported groups (review the report first)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report duplicate groups without changing anything',
+        )
+        parser.add_argument(
+            '--across-folders',
+            action='store_true',
+            help='Merge identical images even when they live in different folders',
+        )
+        parser.add_argument(
+            '--delete-remote',
+            action='store_true',
+            help='Also delete the duplicates from Cloudinary',
+        )
+
+    def handle(self, *args, **options):
+        # Perceptual matches can be different images, so they are merged only on request
+        dry_run = options['dry_run'] or (options['perceptual'] and not options['apply'])
+        # A dry run saves nothing, so group on the backfilled hashes held in memory
+        hashed = self.backfill(options['dry_run']) if options['backfill'] else {}
+
+        field = 'perceptual_hash' if options['perceptual'] else 'content_hash'
+        groups = defaultdict(list)
+        for asset in MediaAsset.objects.order_by('created_at', 'id'):
+            asset = hashed.get(asset.id, asset)
+            digest = getattr(asset, field)
+            if digest:
+                groups[digest if options['across_folders'] else (asset.folder, digest)].append(asset)
+
+        removed = rewritten = 0
+        for group, assets in groups.items():
+            digest = group if options['across_folders'] else f'{group[0]}/{group[1]}'
+            if len(assets) < 2:
+                continue
+            keeper, duplicates = assets[0], assets[1:]
+            self.stdout.write(
+                f'{digest}: keeping #{keeper.id} "{keeper.title}", '
+                f'merging {", ".join(f"#{asset.id}" for asset in duplicates)}'
+            )
+            if dry_run:
+                removed += len(duplicates)
+                continue
+            rewritten += collapse_duplicates(keeper, duplicates)
+            removed += len(duplicates)
+            if options['delete_remote']:
+                for asset in duplicates:
+                    if asset.cloudinary_public_id and asset.cloudinary_public_id != keeper.cloudinary_public_id:
+                        try:
+                            cloudinary.uploader.destroy(asset.cloudinary_public_id, invalidate=True)
+                        except Exception as e:
+                            self.stderr.write(f'Could not delete {asset.cloudinary_public_id}: {e}')
+
+        verb = 'Would remove' if dry_run else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {verb} {removed} duplicate asset(s), {rewritten} content reference(s) updated'
+        ))
+        if dry_run and options['perceptual'] and not options['dry_run'] and removed:
+            self.stdout.write('Perceptual matches were only reported; review them, then re-run with --apply to merge')
+
+    def backfill(self, dry_run):
+        """
+        Hash assets saved before content hashing, from the image stored in
+        Cloudinary. Returns {asset id: asset} for the assets hashed.
+        """
+        missing = MediaAsset.objects.filter(content_hash='')
+        updated = []
+        for asset in missing.iterator():
+            url = asset.original_url or asset.cloudinary_url
+            if not url:
+                continue
+            try:
+                data = _download(url)
+            except Exception as e:
+                self.stderr.write(f'Could not download asset #{asset.id}: {e}')
+                continue
+            asset.content_hash = content_hash(data)
+            info = analyze_image(io.BytesIO(data))
+            asset.perceptual_hash = info.get('perceptual_hash', '')
+            asset.derivatives = info.get('derivatives', {})
+            updated.append(asset)
+        if not dry_run and updated:
+            MediaAsset.objects.bulk_update(updated, ['content_hash', 'perceptual_hash', 'derivatives'], batch_size=500)
+        self.stdout.write(f'Hashed {len(updated)} asset(s)')
+        return {asset.id: asset for asset in updated}
@@ -0,0 +1,22 @@
+"""
+Management command to write buffered onboarding autosaves to the database
+Run: python manage.py flush_onboarding_autosaves  (e.g. every minute from cron)
+"""
+from django.core.management.base import BaseCommand
+from myApp import autosave_buffer
+
+
+class Command(BaseCommand):
+    help = 'Flush write-behind onboarding autosaves that are older than the buffer interval'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Flush every pending session regardless of age',
+        )
+
+    def handle(self, *args, **options):
+        max_age = 0 if options['all'] else None
+        flushed = autosave_buffer.flush_due(max_age=max_age)
+        self.stdout.write(self.style.SUCCESS(f'✓ Flushed {len(flushed)} onboarding session(s)'))
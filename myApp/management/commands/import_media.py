@@ -0,0 +1,153 @@
+"""
+Management command to bulk import an existing image library into the gallery
+Files are compressed and uploaded concurrently through the same pipeline as
+dashboard uploads (already-stored images are matched by content hash and
+skipped). Completed files are appended to a checkpoint file, so an
+interrupted import picks up where it stopped when re-run.
+Run: python manage.py import_media /path/to/library --folder katek_ai/clients/acme
+     python manage.py import_media manifest.csv --workers 8 --stub
+"""
+import csv
+import hashlib
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from myApp.media_helpers import iter_media_uploads, create_media_assets
+from myApp.utils.cloudinary_utils import stub_upload_bytes
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tif', '.tiff'}
+
+
+def iter_directory(root):
+    """(path, title) for every image under root, in a stable order"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+                yield os.path.join(dirpath, filename), filename
+
+
+def iter_manifest(manifest):
+    """
+    (path, title) from a manifest: a CSV with a `path` column (and optional
+    `title`), or a plain list of paths, one per line. Relative paths are
+    resolved against the manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, newline='', encoding='utf-8') as f:
+        if manifest.lower().endswith('.csv'):
+            rows = ((row.get('path', ''), row.get('title', '')) for row in csv.DictReader(f))
+        else:
+            rows = ((line.strip(), '') for line in f if line.strip() and not line.startswith('#'))
+        for path, title in rows:
+            path = path.strip()
+            if path:
+                yield os.path.join(base, path), title.strip() or os.path.basename(path)
+
+
+def default_checkpoint(source):
+    """Checkpoint file in the working directory, one per import source"""
+    digest = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:10]
+    return f'.import_media-{digest}.checkpoint'
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+class Command(BaseCommand):
+    help = 'Compress, upload and record a directory or manifest of images as MediaAssets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Directory to walk, or a manifest (.csv with a path column, or one path per line)')
+        parser.add_argument('--folder', default='katek_ai/uploads', help='Cloudinary / gallery folder for the imported assets')
+        parser.add_argument('--workers', type=int, default=None, help='Concurrent uploads (default: UPLOAD_MAX_CONCURRENCY)')
+        parser.add_argument('--batch-size', type=int, default=50, help='Files read, uploaded and saved per batch')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: derived from the source path)')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint and import everything')
+        parser.add_argument('--stub', action='store_true', help='Use the local stub uploader instead of Cloudinary')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if os.path.isdir(source):
+            entries = list(iter_directory(source))
+        elif os.path.isfile(source):
+            entries = list(iter_manifest(source))
+        else:
+            raise CommandError(f'No such directory or manifest: {source}')
+
+        checkpoint = options['checkpoint'] or default_checkpoint(source)
+        if options['restart'] and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        done = load_checkpoint(checkpoint)
+        pending = [(path, title) for path, title in entries if os.path.abspath(path) not in done]
+        self.stdout.write(
+            f'{len(entries)} file(s) found, {len(entries) - len(pending)} already imported '
+            f'(checkpoint: {checkpoint})'
+        )
+        if not pending:
+            self.stdout.write(self.style.SUCCESS('✓ Nothing to import'))
+            return
+
+        uploader = stub_upload_bytes if options['stub'] else None
+        batch_size = max(1, options['batch_size'])
+        folder = options['folder']
+        created = duplicates = failed = processed = 0
+        total_bytes = 0
+        started = time.monotonic()
+
+        with open(checkpoint, 'a', encoding='utf-8') as checkpoint_file:
+            for offset in range(0, len(pending), batch_size):
+                batch = pending[offset:offset + batch_size]
+                files = []
+                titles = []
+                paths = []
+                for path, title in batch:
+                    try:
+                        with open(path, 'rb') as f:
+                            data = f.read()
+                    except OSError as e:
+                        failed += 1
+                        self.stderr.write(f'Could not read {path}: {e}')
+                        continue
+                    files.append((os.path.basename(path), data))
+                    titles.append(title)
+                    paths.append(os.path.abspath(path))
+                    total_bytes += len(data)
+
+                results = list(iter_media_uploads(
+                    files, folder=folder, uploader=uploader, upload_workers=options['workers']
+                ))
+                media_assets = create_media_assets(results, titles, folder)
+
+                for result in sorted(results, key=lambda result: result.index):
+                    if not result.ok:
+                        failed += 1
+                        self.stderr.write(f'Failed {paths[result.index]}: {result.error}')
+                        continue
+                    if result.duplicate:
+                        duplicates += 1
+                    elif result.index in media_assets:
+                        created += 1
+                    # Only files that made it into the gallery are checkpointed; failures retry on the next run
+                    checkpoint_file.write(paths[result.index] + '\n')
+                checkpoint_file.flush()
+                os.fsync(checkpoint_file.fileno())
+
+                processed += len(batch)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'[{processed}/{len(pending)}] {processed / elapsed:.1f} files/s, '
+                    f'{total_bytes / (1024 * 1024) / elapsed:.1f} MB/s '
+                    f'({created} new, {duplicates} duplicate, {failed} failed)'
+                )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Imported {created} new asset(s) in {elapsed:.1f}s '
+            f'({duplicates} already in the gallery, {failed} failed)'
+        ))
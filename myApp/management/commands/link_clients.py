@@ -0,0 +1,36 @@
+"""
+Management command to link sessions to Clients from their meet_you answers
+Sessions are reconciled when their meet_you email or name changes; this
+catches rows saved before that (or whose reconcile failed).
+Run: python manage.py link_clients
+"""
+from django.core.management.base import BaseCommand
+from myApp.client_helpers import reconcile_session_client
+from myApp.models import OnboardingSession
+
+
+class Command(BaseCommand):
+    help = 'Create/attach the Client for sessions that have meet_you data but no client'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Reconcile every session with meet_you data, not only those without a client',
+        )
+
+    def handle(self, *args, **options):
+        sessions = OnboardingSession.objects.exclude(meet_you={}).order_by('id')
+        if not options['all']:
+            sessions = sessions.filter(client__isnull=True)
+        
+        # Full rows: saving `client` also rebuilds the search document from every step
+        checked = linked = 0
+        for session in sessions.iterator(chunk_size=500):
+            checked += 1
+            previous_client_id = session.client_id
+            client = reconcile_session_client(session)
+            if client and client.id != previous_client_id:
+                linked += 1
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ Checked {checked} sessions, linked {linked}'))
@@ -0,0 +1,74 @@
+"""
+Management command to merge duplicate Client rows
+Clients whose emails differ only in case or whitespace are folded into the
+oldest one: its blank details are filled from the duplicates, their
+sessions are moved over and the duplicates are deleted. Afterwards every
+Client has its unique email_normalized set.
+Run: python manage.py merge_clients --dry-run
+"""
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from myApp.client_helpers import CLIENT_DETAIL_FIELDS
+from myApp.models import Client, OnboardingSession
+from myApp.search_helpers import refresh_search_documents
+
+
+class Command(BaseCommand):
+    help = 'Merge Clients that share an email (ignoring case) and backfill email_normalized'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report duplicate groups without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        groups = defaultdict(list)
+        for client in Client.objects.order_by('created_at', 'id'):
+            email_normalized = Client.normalize_email(client.email)
+            if email_normalized:
+                groups[email_normalized].append(client)
+
+        merged = moved = normalized = 0
+        for email_normalized, clients in groups.items():
+            # The row already holding the index entry wins, else the oldest
+            clients.sort(key=lambda client: client.email_normalized != email_normalized)
+            keeper, duplicates = clients[0], clients[1:]
+            if not duplicates:
+                if keeper.email_normalized != email_normalized:
+                    normalized += 1
+                    if not options['dry_run']:
+                        keeper.save(update_fields=['email_normalized'])
+                continue
+
+            self.stdout.write(
+                f'{email_normalized}: keeping #{keeper.id} "{keeper}", '
+                f'merging {", ".join(f"#{client.id}" for client in duplicates)}'
+            )
+            merged += len(duplicates)
+            if options['dry_run']:
+                continue
+
+            with transaction.atomic():
+                for field in CLIENT_DETAIL_FIELDS:
+                    if not getattr(keeper, field):
+                        setattr(keeper, field, next(
+                            (getattr(client, field) for client in duplicates if getattr(client, field)), ''
+                        ))
+                sessions = OnboardingSession.objects.filter(client__in=duplicates)
+                session_ids = list(sessions.values_list('id', flat=True))
+                sessions.update(client=keeper)
+                Client.objects.filter(id__in=[client.id for client in duplicates]).delete()
+                keeper.save()
+                # update() skips save(), so refresh the moved sessions' search text here
+                refresh_search_documents(OnboardingSession.objects.filter(id__in=session_ids))
+            moved += len(session_ids)
+
+        verb = 'Would merge' if options['dry_run'] else 'Merged'
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {verb} {merged} duplicate client(s), {moved} session(s) moved, '
+            f'{normalized} email(s) normalized'
+        ))
@@ -0,0 +1,37 @@
+"""
+Management command to (re)build the session full-text search index
+Recomputes search_document for every session (e.g. after
+get_search_document changes) and makes sure the database index is in place.
+Run: python manage.py rebuild_search_index
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+from myApp.models import OnboardingSession
+from myApp.search_helpers import create_search_index, rebuild_fts_table, refresh_search_documents
+
+
+class Command(BaseCommand):
+    help = 'Recompute search_document for every session and rebuild the search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of sessions to read and update per batch',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Also rebuild the SQLite FTS table from scratch',
+        )
+
+    def handle(self, *args, **options):
+        create_search_index(connection)
+        sessions = OnboardingSession.objects.order_by('id')
+        updated = refresh_search_documents(sessions, batch_size=options['batch_size'])
+        if options['full']:
+            rebuild_fts_table(connection)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Updated {updated} of {sessions.count()} search documents ({connection.vendor})'
+        ))
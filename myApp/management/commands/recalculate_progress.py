@@ -0,0 +1,41 @@
+"""
+Management command to fix steps_mask / steps_completed on legacy sessions
+Run: python manage.py recalculate_progress
+"""
+from django.core.management.base import BaseCommand
+from myApp.models import OnboardingSession
+
+
+class Command(BaseCommand):
+    help = 'Recalculate steps_mask and steps_completed for sessions whose stored progress is out of date'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of sessions to read and update per batch',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        sessions = OnboardingSession.objects.only(
+            'id', 'steps_mask', 'steps_completed', *OnboardingSession.STEP_FIELDS
+        ).order_by('id')
+        
+        checked = 0
+        changed = []
+        fixed = 0
+        for session in sessions.iterator(chunk_size=batch_size):
+            checked += 1
+            stored = (session.steps_mask, session.steps_completed)
+            session.update_progress()
+            if (session.steps_mask, session.steps_completed) != stored:
+                changed.append(session)
+            if len(changed) >= batch_size:
+                fixed += OnboardingSession.objects.bulk_update(changed, ['steps_mask', 'steps_completed'])
+                changed = []
+        if changed:
+            fixed += OnboardingSession.objects.bulk_update(changed, ['steps_mask', 'steps_completed'])
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ Checked {checked} sessions, fixed {fixed}'))
@@ -0,0 +1,126 @@
+"""
+Management command to process queued AI jobs (dashboard summaries, client reconciles)
+Run: python manage.py run_ai_worker --concurrency 4
+Overnight batch: python manage.py run_ai_worker --enqueue-submitted --stale-only --once
+"""
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from myApp import ai_jobs
+
+
+def _run_in_thread(job):
+    try:
+        return ai_jobs.run_job(job)
+    finally:
+        # Each worker thread has its own DB connection
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Process queued AI jobs, running up to --concurrency OpenAI calls at once'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'AI_WORKER_CONCURRENCY', 4),
+            help='Jobs processed in parallel by this worker',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between checks when the queue is empty',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when no queued job is due instead of polling forever (retries waiting out their backoff are left queued)',
+        )
+        parser.add_argument(
+            '--enqueue-submitted',
+            action='store_true',
+            help='First queue a summary for every submitted session',
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='With --enqueue-submitted, skip sessions that already have a summary',
+        )
+        parser.add_argument(
+            '--stale-only',
+            action='store_true',
+            help='With --enqueue-submitted, skip sessions whose summary matches their current data',
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        stale_after = getattr(settings, 'AI_JOB_STALE_SECONDS', 15 * 60)
+
+        if options['enqueue_submitted']:
+            queued = ai_jobs.enqueue_submitted_summaries(
+                missing_only=options['missing_only'],
+                stale_only=options['stale_only']
+            )
+            self.stdout.write(f'Queued {queued} submitted session(s)')
+
+        # Jobs left running by a crashed worker are recovered at start and then periodically
+        stale_check_every = min(stale_after, 60)
+        self.requeue_stale(stale_after)
+        last_stale_check = time.monotonic()
+
+        done = errors = 0
+        running = set()
+        started = time.monotonic()
+        self.stdout.write(f'Worker {worker} running with concurrency {concurrency}')
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                while True:
+                    if time.monotonic() - last_stale_check >= stale_check_every:
+                        self.requeue_stale(stale_after)
+                        last_stale_check = time.monotonic()
+
+                    while len(running) < concurrency:
+                        job = ai_jobs.claim_next(worker)
+                        if job is None:
+                            break
+                        running.add(executor.submit(_run_in_thread, job))
+
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+
+                    finished, running = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        try:
+                            ok = future.result()
+                        except Exception as e:
+                            ok = False
+                            self.stderr.write(f'Job crashed: {e}')
+                        if ok:
+                            done += 1
+                        else:
+                            errors += 1
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping after in-flight jobs finish...')
+                wait(running)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Processed {done + errors} job(s) in {elapsed:.1f}s ({done} done, {errors} failed or retrying)'
+        ))
+
+    def requeue_stale(self, stale_after):
+        requeued, failed = ai_jobs.requeue_stale(stale_after)
+        if requeued or failed:
+            self.stdout.write(f'Recovered {requeued} stale job(s), gave up on {failed}')
@@ -0,0 +1,189 @@
+"""
+Media Helpers - Content-addressed uploads and dedup for MediaAsset
+
+Every upload is identified by the SHA-256 of its bytes. A file whose hash
+already belongs to a MediaAsset in the same folder (or to an earlier file
+in the same batch) is not compressed or uploaded again; it resolves to the
+existing asset. The same image uploaded to another folder gets its own asset.
+
+Hashes are of the bytes as uploaded. Cloudinary stores a re-encoded copy,
+so assets hashed later from their stored image (`dedupe_media --backfill`)
+only match each other; re-uploads of those files are found by perceptual hash.
+
+The gallery listing helpers at the bottom keep the gallery page and picker
+cheap with tens of thousands of assets: keyset pages, word-prefix title
+search and folder counts from one grouped query.
+"""
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .content_helpers import bump_content_version
+from .models import MediaAsset, SEO, WebsiteHero, WebsiteSection, WebsiteTestimonial
+from .utils.upload_pipeline import UploadResult, iter_source_chunks, iter_uploads
+
+# Website content fields that hold MediaAsset URLs (rewritten when duplicates are collapsed)
+MEDIA_URL_FIELDS = [
+    (SEO, 'og_image_url'),
+    (WebsiteHero, 'background_image_url'),
+    (WebsiteHero, 'dashboard_image_url'),
+    (WebsiteSection, 'background_image_url'),
+    (WebsiteTestimonial, 'avatar_url'),
+]
+ASSET_URL_FIELDS = ['cloudinary_url', 'original_url', 'web_url', 'thumbnail_url']
+
+
+def content_hash(source):
+    """SHA-256 of a file's content (bytes, a path or a file object), read in chunks"""
+    digest = hashlib.sha256()
+    for chunk in iter_source_chunks(source):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_assets_by_hash(hashes, folder):
+    """Map of content_hash -> oldest MediaAsset in `folder` with that hash"""
+    assets = {}
+    matches = MediaAsset.objects.filter(content_hash__in=set(hashes), folder=folder)
+    for asset in matches.order_by('created_at', 'id'):
+        assets.setdefault(asset.content_hash, asset)
+    return assets
+
+
+def iter_media_uploads(files, folder='katek_ai/uploads', uploader=None, upload_workers=None):
+    """
+    Upload `files` ((name, content) pairs, see iter_uploads) through the concurrent pipeline,
+    skipping content that is already stored. Yields an UploadResult per file
+    with `content_hash` set, `existing` set to the stored MediaAsset in `folder`
+    it matched and `duplicate` set when the file was not uploaded (stored or repeated content).
+    """
+    files = list(files)
+    hashes = [content_hash(data) for _, data in files]
+    existing = find_assets_by_hash(hashes, folder)
+
+    to_upload = []  # (original index, name, data) for the first file with each new hash
+    batch_duplicates = {}  # hash -> indexes of later files with the same content
+    for index, ((name, data), digest) in enumerate(zip(files, hashes)):
+        if digest in existing:
+            result = UploadResult(index, name)
+            result.content_hash = digest
+            result.existing = existing[digest]
+            result.duplicate = True
+            yield result
+        elif digest in batch_duplicates:
+            batch_duplicates[digest].append(index)
+        else:
+            batch_duplicates[digest] = []
+            to_upload.append((index, name, data))
+
+    uploads = [(name, data) for _, name, data in to_upload]
+    for result in iter_uploads(uploads, folder=folder, uploader=uploader, upload_workers=upload_workers):
+        index = to_upload[result.index][0]
+        digest = hashes[index]
+        result.index = index
+        result.content_hash = digest
+        result.existing = None
+        result.duplicate = False
+        yield result
+        for duplicate_index in batch_duplicates[digest]:
+            duplicate = UploadResult(duplicate_index, files[duplicate_index][0], asset=result.asset, error=result.error)
+            duplicate.content_hash = digest
+            duplicate.existing = None
+            duplicate.duplicate = True
+            yield duplicate
+
+
+def create_media_assets(results, titles, folder):
+    """
+    Store new uploads with one bulk_create (one row per distinct content hash,
+    in the order the files were sent). Returns {result index: MediaAsset}
+    covering both new and pre-existing assets.
+    """
+    by_index = {}
+    new_assets = {}
+    for result in sorted(results, key=lambda result: result.index):
+        if result.existing is not None:
+            by_index[result.index] = result.existing
+        elif result.ok and result.content_hash not in new_assets:
+            asset = result.asset
+            new_assets[result.content_hash] = MediaAsset(
+                title=titles[result.index],
+                cloudinary_url=asset['secure_url'],
+                cloudinary_public_id=asset['public_id'],
+                original_url=asset['original_url'],
+                web_url=asset['web_url'],
+                thumbnail_url=asset['thumbnail_url'],
+                folder=folder,
+                width=asset['width'],
+                height=asset['height'],
+                file_size=asset['bytes'],
+                format=asset['format'],
+                content_hash=result.content_hash,
+                perceptual_hash=asset.get('perceptual_hash', ''),
+                derivatives=asset.get('derivatives', {}),
+            )
+    MediaAsset.objects.bulk_create(new_assets.values())
+    for result in results:
+        if result.existing is None and result.ok:
+            by_index[result.index] = new_assets[result.content_hash]
+    return by_index
+
+
+def collapse_duplicates(keeper, duplicates):
+    """
+    Point website content at `keeper` instead of `duplicates`, then delete the
+    duplicate rows. Returns the number of content fields rewritten.
+    """
+    rewritten = 0
+    with transaction.atomic():
+        for duplicate in duplicates:
+            for asset_field in ASSET_URL_FIELDS:
+                old_url = getattr(duplicate, asset_field)
+                new_url = getattr(keeper, asset_field)
+                if not old_url or old_url == new_url:
+                    continue
+                for model, field in MEDIA_URL_FIELDS:
+                    rewritten += model.objects.filter(**{field: old_url}).update(**{field: new_url})
+        MediaAsset.objects.filter(id__in=[duplicate.id for duplicate in duplicates]).delete()
+    if rewritten:
+        # update() skips the post_save signals that normally invalidate cached content
+        bump_content_version()
+    return rewritten
+
+
+# ==================== GALLERY LISTING ====================
+
+GALLERY_PAGE_SIZE = 48
+GALLERY_MAX_PAGE_SIZE = 100
+GALLERY_SORT = '-created_at'  # Served by media_created_id_idx / media_folder_created_idx
+# Columns the gallery cards use (skips description, hashes and derivatives)
+GALLERY_FIELDS = [
+    'id', 'title', 'cloudinary_url', 'web_url', 'thumbnail_url', 'original_url',
+    'width', 'height', 'format', 'folder', 'created_at',
+]
+
+
+def parse_gallery_limit(value, default=GALLERY_PAGE_SIZE):
+    """Page size from a GET param, clamped to 1..GALLERY_MAX_PAGE_SIZE"""
+    try:
+        return min(max(int(value), 1), GALLERY_MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        return default
+
+
+def search_assets(assets, query):
+    """
+    Titles where the query starts the title or any word in it ("hero" finds
+    "Homepage hero"). On PostgreSQL both lookups use the title trigram index
+    (created by migration 0010 when the pg_trgm extension is installed).
+    """
+    query = query.strip()
+    if not query:
+        return assets
+    return assets.filter(Q(title__istartswith=query) | Q(title__icontains=f' {query}'))
+
+
+def folder_facets(assets):
+    """[{'folder', 'count'}] for `assets`, one grouped query over the folder index"""
+    return list(assets.order_by('folder').values('folder').annotate(count=Count('id')))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0004_mediaasset_seo_websitefooter_websitehero_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='onboardingsession',
+            name='revision',
+            field=models.IntegerField(default=0),
+        ),
+    ]
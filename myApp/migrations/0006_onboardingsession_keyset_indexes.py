@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0005_onboardingsession_revision'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='onboardingsession',
+            index=models.Index(fields=['created_at', 'id'], name='session_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onboardingsession',
+            index=models.Index(fields=['updated_at', 'id'], name='session_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onboardingsession',
+            index=models.Index(fields=['status', 'id'], name='session_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onboardingsession',
+            index=models.Index(fields=['steps_completed', 'id'], name='session_steps_id_idx'),
+        ),
+    ]
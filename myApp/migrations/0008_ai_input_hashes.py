@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0007_aijob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aijob',
+            name='force',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='onboardingsession',
+            name='ai_outline_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='onboardingsession',
+            name='ai_summary_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
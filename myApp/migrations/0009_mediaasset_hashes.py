@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0008_ai_input_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='perceptual_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=16),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:47
+
+import warnings
+
+from django.db import migrations, models
+
+# Prerequisite for the title trigram index on PostgreSQL: the pg_trgm
+# extension, which needs a privileged role to install. Before migrating,
+# as a superuser (or the database owner on managed Postgres) run:
+#     CREATE EXTENSION IF NOT EXISTS pg_trgm;
+# Without it the index is skipped with a warning and title search falls
+# back to a sequential scan; to add it later, install the extension and run
+#     python manage.py migrate myApp 0009 && python manage.py migrate
+
+
+def create_title_trigram_index(apps, schema_editor):
+    # Gallery title search (istartswith / icontains compile to UPPER(title::text) LIKE ...);
+    # a trigram GIN index serves both on PostgreSQL. SQLite has no equivalent.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        installed = cursor.fetchone() is not None
+    if not installed:
+        warnings.warn(
+            'pg_trgm is not installed, so media_title_trgm_idx was not created '
+            '(see the note at the top of myApp/migrations/0010_mediaasset_gallery_indexes.py)'
+        )
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS media_title_trgm_idx ON "myApp_mediaasset" '
+        'USING gin ((UPPER("title"::text)) gin_trgm_ops)'
+    )
+
+
+def drop_title_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS media_title_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0009_mediaasset_hashes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediaasset',
+            index=models.Index(fields=['created_at', 'id'], name='media_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaasset',
+            index=models.Index(fields=['folder', 'created_at', 'id'], name='media_folder_created_idx'),
+        ),
+        migrations.RunPython(create_title_trigram_index, drop_title_trigram_index),
+    ]
@@ -0,0 +1,129 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Frozen copies of the search index DDL and document builder as of this
+# migration; later changes to search_helpers / get_search_document must not
+# change what this migration does.
+STEP_FIELDS = [
+    'meet_you', 'course_idea', 'transformation_outcomes',
+    'existing_materials', 'brand_vibe', 'course_structure',
+    'media_content', 'legal_rights', 'platform_money',
+    'timelines_priorities', 'reviews_decision_makers', 'final_uploads',
+]
+SEARCH_DOCUMENT_MAX_LENGTH = 100000
+
+SEARCH_INDEX_SQL = {
+    'postgresql': [
+        """ALTER TABLE "myApp_onboardingsession" ADD COLUMN IF NOT EXISTS search_vector tsvector
+           GENERATED ALWAYS AS (to_tsvector('english'::regconfig, search_document)) STORED""",
+        'CREATE INDEX IF NOT EXISTS session_search_vector_idx ON "myApp_onboardingsession" USING gin (search_vector)',
+    ],
+    'sqlite': [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS session_search USING fts5(
+           search_document, content='myApp_onboardingsession', content_rowid='id',
+           tokenize='porter unicode61')""",
+        # Index the documents backfilled below
+        "INSERT INTO session_search(session_search) VALUES ('rebuild')",
+        """CREATE TRIGGER IF NOT EXISTS session_search_ai AFTER INSERT ON "myApp_onboardingsession" BEGIN
+           INSERT INTO session_search(rowid, search_document) VALUES (new.id, new.search_document);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS session_search_ad AFTER DELETE ON "myApp_onboardingsession" BEGIN
+           INSERT INTO session_search(session_search, rowid, search_document) VALUES ('delete', old.id, old.search_document);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS session_search_au AFTER UPDATE OF search_document ON "myApp_onboardingsession" BEGIN
+           INSERT INTO session_search(session_search, rowid, search_document) VALUES ('delete', old.id, old.search_document);
+           INSERT INTO session_search(rowid, search_document) VALUES (new.id, new.search_document);
+           END""",
+    ],
+}
+DROP_SEARCH_INDEX_SQL = {
+    'postgresql': [
+        'DROP INDEX IF EXISTS session_search_vector_idx',
+        'ALTER TABLE "myApp_onboardingsession" DROP COLUMN IF EXISTS search_vector',
+    ],
+    'sqlite': [
+        'DROP TRIGGER IF EXISTS session_search_ai',
+        'DROP TRIGGER IF EXISTS session_search_ad',
+        'DROP TRIGGER IF EXISTS session_search_au',
+        'DROP TABLE IF EXISTS session_search',
+    ],
+}
+
+
+def search_document(session):
+    parts = [session.session_id or '', session.course_title]
+    if session.client_id and session.client:
+        parts.extend([session.client.full_name, session.client.brand_name, session.client.email])
+
+    def collect(value):
+        if isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+        elif isinstance(value, str):
+            text = value.strip()
+            if text and not text.startswith(('http://', 'https://')):
+                parts.append(text)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            parts.append(str(value))
+
+    collect({field: getattr(session, field) for field in STEP_FIELDS})
+    return '\n'.join(part for part in parts if part)[:SEARCH_DOCUMENT_MAX_LENGTH]
+
+
+def backfill_search_documents(apps, schema_editor):
+    OnboardingSession = apps.get_model('myApp', 'OnboardingSession')
+    sessions = OnboardingSession.objects.using(schema_editor.connection.alias).select_related('client')
+    changed = []
+    for session in sessions.order_by('id').iterator(chunk_size=500):
+        session.search_document = search_document(session)
+        changed.append(session)
+        if len(changed) >= 500:
+            OnboardingSession.objects.bulk_update(changed, ['search_document'])
+            changed = []
+    if changed:
+        OnboardingSession.objects.bulk_update(changed, ['search_document'])
+
+
+def create_search_index(apps, schema_editor):
+    for statement in SEARCH_INDEX_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    for statement in DROP_SEARCH_INDEX_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0010_mediaasset_gallery_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='onboardingsession',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.CreateModel(
+            name='SessionSearch',
+            fields=[
+                ('session', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='myApp.onboardingsession')),
+                ('search_document', models.TextField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'session_search',
+                'managed': False,
+            },
+        ),
+        # Documents first, so the index is built from them (no triggers fire yet)
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.2 on 2026-10-18 00:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copy of OnboardingSession.STEP_FIELDS (bit i = step i)
+STEP_FIELDS = [
+    'meet_you', 'course_idea', 'transformation_outcomes',
+    'existing_materials', 'brand_vibe', 'course_structure',
+    'media_content', 'legal_rights', 'platform_money',
+    'timelines_priorities', 'reviews_decision_makers', 'final_uploads',
+]
+
+
+def backfill_steps_mask(apps, schema_editor):
+    """Saves only update the bits of the steps they touch, so existing rows need the full mask"""
+    OnboardingSession = apps.get_model('myApp', 'OnboardingSession')
+    sessions = OnboardingSession.objects.only('id', *STEP_FIELDS).order_by('id')
+    changed = []
+    for session in sessions.iterator(chunk_size=500):
+        mask = 0
+        for index, step_name in enumerate(STEP_FIELDS):
+            step = getattr(session, step_name)
+            if step and isinstance(step, dict):
+                mask |= 1 << index
+        if mask:
+            session.steps_mask = mask
+            session.steps_completed = mask.bit_count()
+            changed.append(session)
+        if len(changed) >= 500:
+            OnboardingSession.objects.bulk_update(changed, ['steps_mask', 'steps_completed'])
+            changed = []
+    if changed:
+        OnboardingSession.objects.bulk_update(changed, ['steps_mask', 'steps_completed'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0011_session_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='onboardingsession',
+            name='steps_mask',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='onboardingsession',
+            index=models.Index(fields=['status', 'steps_mask'], name='session_status_mask_idx'),
+        ),
+        migrations.RunPython(backfill_steps_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:00
+
+from django.db import migrations, models
+
+# Only the oldest Client per email gets email_normalized here; the others stay
+# NULL (Client.save keeps them NULL) until `python manage.py merge_clients` folds them in.
+
+
+def backfill_email_normalized(apps, schema_editor):
+    Client = apps.get_model('myApp', 'Client')
+    seen = set()
+    updated = []
+    for client in Client.objects.order_by('created_at', 'id').only('id', 'email').iterator(chunk_size=500):
+        normalized = (client.email or '').strip().lower() or None
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            client.email_normalized = normalized
+            updated.append(client)
+    Client.objects.bulk_update(updated, ['email_normalized'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0012_onboardingsession_steps_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='email_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=254, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='aijob',
+            name='kind',
+            field=models.CharField(choices=[('session_summary', 'Session Summary'), ('client_reconcile', 'Client Reconcile')], default='session_summary', max_length=30),
+        ),
+        migrations.RunPython(backfill_email_normalized, migrations.RunPython.noop),
+    ]
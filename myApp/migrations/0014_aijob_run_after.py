@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0013_client_email_normalized'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aijob',
+            name='run_after',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
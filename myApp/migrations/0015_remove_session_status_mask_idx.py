@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:28
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0014_aijob_run_after'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='onboardingsession',
+            name='session_status_mask_idx',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myApp', '0015_remove_session_status_mask_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='onboardingsession',
+            name='ai_outline_hash',
+        ),
+    ]
@@ -8,6 +8,8 @@ class Client(models.Model):
     full_name = models.CharField(max_length=255)
     brand_name = models.CharField(max_length=255, blank=True)
     email = models.EmailField()
+    # Lowercased email, unique: one Client per person (set on save; see client_helpers)
+    email_normalized = models.CharField(max_length=254, null=True, blank=True, unique=True, editable=False)
     phone = models.CharField(max_length=50, blank=True)
     website = models.URLField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -18,6 +20,24 @@ class Client(models.Model):
     
     def __str__(self):
         return self.full_name or self.email
+    
+    @staticmethod
+    def normalize_email(email):
+        """Case-insensitive identity for an email address (None when empty)"""
+        return (email or '').strip().lower() or None
+    
+    def save(self, *args, **kwargs):
+        email_normalized = self.normalize_email(self.email)
+        if (self.pk is not None and email_normalized and email_normalized != self.email_normalized
+                and Client.objects.filter(email_normalized=email_normalized).exclude(pk=self.pk).exists()):
+            # An older duplicate: stays unindexed until `manage.py merge_clients` folds it in.
+            # New rows always claim the value, so concurrent creates still hit the unique index.
+            email_normalized = None
+        self.email_normalized = email_normalized
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'email' in update_fields and 'email_normalized' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'email_normalized']
+        super().save(*args, **kwargs)
 
 
 class OnboardingSession(models.Model):
@@ -34,6 +54,18 @@ class OnboardingSession(models.Model):
         ('submitted', 'Submitted'),  # Legacy
     ]
     
+    # Step JSON fields, in wizard order
+    STEP_FIELDS = [
+        'meet_you', 'course_idea', 'transformation_outcomes',
+        'existing_materials', 'brand_vibe', 'course_structure',
+        'media_content', 'legal_rights', 'platform_money',
+        'timelines_priorities', 'reviews_decision_makers', 'final_uploads',
+    ]
+    
+    # Fields whose changes rebuild search_document
+    SEARCH_SOURCE_FIELDS = frozenset(['session_id', 'course_title', 'client', *STEP_FIELDS])
+    SEARCH_DOCUMENT_MAX_LENGTH = 100000
+    
     # Client reference
     client = models.ForeignKey(
         'Client',
@@ -78,10 +110,19 @@ class OnboardingSession(models.Model):
     # AI-generated content
     ai_summary = models.TextField(blank=True)
     ai_outline = models.JSONField(default=dict, blank=True)
-    
-    # Progress tracking
+    # Fingerprint of the step data + prompt version the summary was generated from
+    ai_summary_hash = models.CharField(max_length=64, blank=True)
+    
+    # Progress tracking: bit i of steps_mask is set when STEP_FIELDS[i] has data.
+    # Both are maintained by save(); steps_completed is the number of set bits.
+    # "Missing step X" filters test a bit per row instead of decoding step JSON
+    # (a bitwise predicate, so no index serves it).
+    steps_mask = models.IntegerField(default=0)
     steps_completed = models.IntegerField(default=0)
     
+    # Incremented on every save; delta autosaves must send the revision they are based on
+    revision = models.IntegerField(default=0)
+    
     # Step data stored as JSON
     # Step 1: Meet You
     meet_you = models.JSONField(default=dict, blank=True)
@@ -119,6 +160,10 @@ class OnboardingSession(models.Model):
     # Step 12: Final Uploads & Secret Notes
     final_uploads = models.JSONField(default=dict, blank=True)
     
+    # Plain text of the session, client and every step answer, kept in sync on save.
+    # Indexed by a tsvector GIN index (PostgreSQL) or an FTS5 table (SQLite); see search_helpers
+    search_document = models.TextField(blank=True, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -129,12 +174,84 @@ class OnboardingSession(models.Model):
         indexes = [
             models.Index(fields=['user', 'status']),
             models.Index(fields=['session_id', 'status']),
+            # Keyset pagination: one (sort key, id) index per allowed sort
+            models.Index(fields=['created_at', 'id'], name='session_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='session_updated_id_idx'),
+            models.Index(fields=['status', 'id'], name='session_status_id_idx'),
+            models.Index(fields=['steps_completed', 'id'], name='session_steps_id_idx'),
         ]
     
     def __str__(self):
         user_str = self.user.username if self.user else f"Session {self.session_id}"
         return f"Onboarding: {user_str} - {self.status}"
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.update_progress()
+            self.search_document = self.get_search_document()
+        else:
+            extra_fields = []
+            touched_steps = [field for field in self.STEP_FIELDS if field in update_fields]
+            if touched_steps and 'steps_mask' not in update_fields:
+                extra_fields.extend(self.update_progress(touched_steps))
+            if 'search_document' not in update_fields and self.SEARCH_SOURCE_FIELDS.intersection(update_fields):
+                self.search_document = self.get_search_document()
+                extra_fields.append('search_document')
+            if extra_fields:
+                kwargs['update_fields'] = list(dict.fromkeys([*update_fields, *extra_fields]))
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def step_bit(cls, step_name):
+        """steps_mask bit for a step field name"""
+        return 1 << cls.STEP_FIELDS.index(step_name)
+    
+    def is_step_complete(self, step_name):
+        return bool(self.steps_mask & self.step_bit(step_name))
+    
+    def update_progress(self, steps=None):
+        """
+        Refresh the steps_mask bits for `steps` (default: all of them) from
+        the step data and derive steps_completed. Only the given step fields
+        are read, so a save touching one step doesn't load the other eleven.
+        Returns the fields to save.
+        """
+        mask = self.steps_mask or 0
+        for step_name in (steps if steps is not None else self.STEP_FIELDS):
+            step = getattr(self, step_name)
+            bit = self.step_bit(step_name)
+            if step and isinstance(step, dict):
+                mask |= bit
+            else:
+                mask &= ~bit
+        self.steps_mask = mask
+        self.steps_completed = mask.bit_count()
+        return ['steps_mask', 'steps_completed']
+    
+    def get_search_document(self):
+        """Searchable text: identifiers, client, then every step answer (URLs skipped)"""
+        parts = [self.session_id or '', self.course_title]
+        if self.client_id and self.client:
+            parts.extend([self.client.full_name, self.client.brand_name, self.client.email])
+        
+        def collect(value):
+            if isinstance(value, dict):
+                for item in value.values():
+                    collect(item)
+            elif isinstance(value, list):
+                for item in value:
+                    collect(item)
+            elif isinstance(value, str):
+                text = value.strip()
+                if text and not text.startswith(('http://', 'https://')):
+                    parts.append(text)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                parts.append(str(value))
+        
+        collect(self.get_all_data())
+        return '\n'.join(part for part in parts if part)[:self.SEARCH_DOCUMENT_MAX_LENGTH]
+    
     def get_all_data(self):
         """Returns all step data as a single dictionary"""
         return {
@@ -163,19 +280,50 @@ class OnboardingSession(models.Model):
                 setattr(self, step_name, data)
             self.save(update_fields=[step_name, 'updated_at'])
     
+    def merge_step_changes(self, changes):
+        """
+        Merge delta changes into the step JSON fields (without saving).
+        `changes` maps dotted paths like 'course_idea.course_title' to values;
+        a None value removes the key. Returns the list of touched step fields.
+        """
+        touched = []
+        for path, value in changes.items():
+            step_name, _, field_path = str(path).partition('.')
+            if step_name not in self.STEP_FIELDS:
+                raise ValueError(f'Unknown step: {step_name}')
+            
+            step_data = getattr(self, step_name)
+            if not isinstance(step_data, dict):
+                step_data = {}
+            
+            if not field_path:
+                # Whole-step change
+                if not isinstance(value, dict):
+                    raise ValueError(f'Step {step_name} must be an object')
+                step_data.update(value)
+            else:
+                keys = field_path.split('.')
+                target = step_data
+                for key in keys[:-1]:
+                    if not isinstance(target.get(key), dict):
+                        target[key] = {}
+                    target = target[key]
+                if value is None:
+                    target.pop(keys[-1], None)
+                else:
+                    target[keys[-1]] = value
+            
+            setattr(self, step_name, step_data)
+            if step_name not in touched:
+                touched.append(step_name)
+        return touched
+    
     def calculate_progress(self, save=True):
-        """Calculate how many steps have been completed"""
-        steps = [
-            self.meet_you, self.course_idea, self.transformation_outcomes,
-            self.existing_materials, self.brand_vibe, self.course_structure,
-            self.media_content, self.legal_rights, self.platform_money,
-            self.timelines_priorities, self.reviews_decision_makers, self.final_uploads
-        ]
-        completed = sum(1 for step in steps if step and isinstance(step, dict) and len(step) > 0)
-        self.steps_completed = completed
+        """Recompute progress from every step (save() already keeps it current)"""
+        update_fields = self.update_progress()
         if save:
-            self.save(update_fields=['steps_completed'])
-        return completed
+            self.save(update_fields=update_fields)
+        return self.steps_completed
     
     def extract_denormalized_fields(self):
         """Extract important fields from JSON data for quick access"""
@@ -200,6 +348,28 @@ class OnboardingSession(models.Model):
             self.access_model = self.platform_money.get('pricing_model', '') or self.access_model
 
 
+class SessionSearch(models.Model):
+    """
+    SQLite FTS5 table over OnboardingSession.search_document (created by
+    search_helpers, not by Django; unused on PostgreSQL). Lets search queries
+    join the index and order by its bm25 `rank`.
+    """
+    session = models.OneToOneField(
+        OnboardingSession,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_entry'
+    )
+    search_document = models.TextField()
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = 'session_search'
+
+
 class Tag(models.Model):
     """Tags for categorizing sessions"""
     name = models.CharField(max_length=100, unique=True)
@@ -271,6 +441,45 @@ class Task(models.Model):
         return f"{self.title} - {self.session}"
 
 
+class AIJob(models.Model):
+    """Queued background work (AI generation, client reconciles), processed by `python manage.py run_ai_worker`"""
+    KIND_CHOICES = [
+        ('session_summary', 'Session Summary'),
+        ('client_reconcile', 'Client Reconcile'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES, default='session_summary')
+    session = models.ForeignKey(OnboardingSession, on_delete=models.CASCADE, related_name='ai_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    result = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    force = models.BooleanField(default=False)  # Regenerate even if the stored result is current
+    worker = models.CharField(max_length=100, blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='ai_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    run_after = models.DateTimeField(null=True, blank=True)  # Retry backoff: not claimed before this time
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            # Workers claim the oldest queued job first
+            models.Index(fields=['status', 'created_at'], name='aijob_status_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.id} ({self.status}) - {self.session}"
+
+
 # ==================== WEBSITE CONTENT MODELS ====================
 
 class MediaAsset(models.Model):
@@ -287,11 +496,21 @@ class MediaAsset(models.Model):
     height = models.IntegerField(null=True, blank=True)
     file_size = models.IntegerField(null=True, blank=True)
     format = models.CharField(max_length=10, blank=True)
+    # Identical uploads short-circuit to the existing asset (see media_helpers)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of the uploaded file
+    perceptual_hash = models.CharField(max_length=16, blank=True, db_index=True)  # 64-bit dHash, hex
+    # Rendered size of each URL variant: {'web': {'width', 'height', 'bytes'}, 'thumbnail': {...}}
+    derivatives = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Gallery keyset pagination, across all folders and within one folder
+            models.Index(fields=['created_at', 'id'], name='media_created_id_idx'),
+            models.Index(fields=['folder', 'created_at', 'id'], name='media_folder_created_idx'),
+        ]
     
     def __str__(self):
         return self.title or self.cloudinary_public_id or 'Untitled Asset'
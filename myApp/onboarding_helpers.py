@@ -0,0 +1,96 @@
+"""
+Onboarding Helpers - Shared save logic for the onboarding wizard
+"""
+import uuid
+
+from .models import OnboardingSession
+
+
+def get_or_create_onboarding_session(session_id, user):
+    """Find the wizard session for this request, creating it if needed"""
+    if session_id:
+        session = OnboardingSession.objects.filter(session_id=session_id).first()
+        if not session:
+            session = OnboardingSession.objects.create(
+                session_id=session_id,
+                user=user
+            )
+    elif user:
+        # Get most recent in-progress session for this user
+        session = OnboardingSession.objects.filter(
+            user=user,
+            status='in_progress'
+        ).order_by('-created_at').first()
+        
+        if not session:
+            session = OnboardingSession.objects.create(
+                user=user,
+                session_id=str(uuid.uuid4())
+            )
+    else:
+        # Create new anonymous session
+        session = OnboardingSession.objects.create(
+            session_id=str(uuid.uuid4())
+        )
+    return session
+
+
+# Denormalized columns derived from each step
+DENORMALIZED_STEP_FIELDS = {
+    'course_idea': ['course_title', 'audience_summary'],
+    'transformation_outcomes': ['main_outcomes'],
+    'platform_money': ['access_model'],
+}
+
+
+def update_denormalized_fields(session, step_key, step_data):
+    """Extract denormalized fields for quick access, returns the columns it may have changed"""
+    if not step_data:
+        return []
+    if step_key == 'course_idea':
+        session.course_title = step_data.get('course_title', '') or session.course_title
+        session.audience_summary = step_data.get('target_audience', '') or step_data.get('ideal_student', '') or session.audience_summary
+    elif step_key == 'transformation_outcomes':
+        outcomes = step_data.get('learning_outcomes', '') or step_data.get('transformation', '')
+        if isinstance(outcomes, str):
+            session.main_outcomes = outcomes or session.main_outcomes
+        elif isinstance(outcomes, list):
+            session.main_outcomes = '\n'.join(outcomes) or session.main_outcomes
+    elif step_key == 'platform_money':
+        session.access_model = step_data.get('pricing_model', '') or step_data.get('price_point', '') or session.access_model
+    return DENORMALIZED_STEP_FIELDS.get(step_key, [])
+
+
+def flatten_steps(steps_data):
+    """
+    {'course_idea': {'course_title': 'x'}} -> {'course_idea.course_title': 'x'}
+    (full-mode saves as delta changes, and blueprint export rows)
+    """
+    changes = {}
+    for step_key, step_data in (steps_data or {}).items():
+        if isinstance(step_data, dict):
+            for field, value in step_data.items():
+                changes[f'{step_key}.{field}'] = value
+    return changes
+
+
+def apply_step_changes(session, changes):
+    """
+    Merge delta changes into the session and update denormalized
+    columns and progress (without saving). The client link is reconciled
+    after the write, see client_helpers.request_client_reconcile.
+    Returns (touched_steps, update_fields).
+    """
+    touched_steps = session.merge_step_changes(changes)
+    
+    update_fields = list(touched_steps)
+    for step_key in touched_steps:
+        step_data = getattr(session, step_key)
+        update_fields.extend(update_denormalized_fields(session, step_key, step_data))
+    
+    if touched_steps:
+        update_fields.extend(session.update_progress(touched_steps))
+        session.search_document = session.get_search_document()
+        update_fields.append('search_document')
+    
+    return touched_steps, update_fields
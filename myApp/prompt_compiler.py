@@ -0,0 +1,149 @@
+"""
+Prompt Compiler - Compact, size-bounded rendering of blueprint data for AI prompts
+
+Step data is rendered as "step / key: value" lines instead of indented JSON.
+Empty values are dropped, uploaded-file URLs are collapsed to counts, and
+long free-text answers are shortened so the whole blueprint fits a token
+budget no matter how much a creator typed.
+"""
+import math
+import re
+from functools import lru_cache
+
+URL_RE = re.compile(r'^https?://\S+$')
+ELLIPSIS = '…'
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model):
+    """tiktoken encoding for the model, or None when tiktoken is not installed"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+
+
+def estimate_tokens(text, model='gpt-4'):
+    """Token count of text (exact with tiktoken installed, otherwise ~4 characters per token)"""
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _is_url(value):
+    return isinstance(value, str) and bool(URL_RE.match(value.strip()))
+
+
+def _compact_value(value):
+    """Scalar text for a value, or None if it carries nothing worth sending"""
+    if isinstance(value, list):
+        items = [item for item in value if item not in (None, '', [], {})]
+        if not items:
+            return None
+        if all(_is_url(item) for item in items):
+            return f'[{len(items)} file{"s" if len(items) != 1 else ""}]'
+        return ', '.join(str(_compact_value(item) or '') for item in items)
+    if isinstance(value, bool):
+        return 'yes' if value else 'no'
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    if _is_url(text):
+        return '[link]'
+    return text
+
+
+def _flatten(prefix, value, out):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f'{prefix}.{key}' if prefix else str(key), item, out)
+        return
+    text = _compact_value(value)
+    if text is not None:
+        out.append((prefix, text))
+
+
+def _truncate(text, max_tokens, model):
+    """Shorten text to roughly max_tokens, cutting at a word boundary"""
+    tokens = estimate_tokens(text, model)
+    if tokens <= max_tokens:
+        return text
+    keep = max(0, int(len(text) * max_tokens / tokens))
+    cut = text[:keep]
+    if ' ' in cut[keep // 2:]:
+        cut = cut[:cut.rindex(' ')]
+    return cut.rstrip() + ELLIPSIS
+
+
+class CompiledPrompt:
+    """Rendered blueprint text plus its token accounting"""
+    def __init__(self, text, tokens, original_tokens, budget, truncated_fields):
+        self.text = text
+        self.tokens = tokens
+        self.original_tokens = original_tokens
+        self.budget = budget
+        self.truncated_fields = truncated_fields
+
+    def stats(self):
+        return {
+            'tokens': self.tokens,
+            'original_tokens': self.original_tokens,
+            'budget': self.budget,
+            'truncated_fields': self.truncated_fields,
+        }
+
+
+def compile_blueprint(data, budget, model='gpt-4'):
+    """
+    Render {step: {field: value}} as compact lines within `budget` tokens.
+    When over budget, the longest answers are cut down to a common cap so
+    short answers are never touched.
+    """
+    fields = []
+    for step, step_data in data.items():
+        if isinstance(step_data, dict):
+            _flatten(step, step_data, fields)
+
+    def render(items):
+        return '\n'.join(f'{key}: {value}' for key, value in items)
+
+    full_text = render(fields)
+    original_tokens = estimate_tokens(full_text, model)
+    if original_tokens <= budget:
+        return CompiledPrompt(full_text, original_tokens, original_tokens, budget, [])
+
+    # Tokens per answer, and what the keys and separators cost on their own
+    sizes = [estimate_tokens(value, model) for _, value in fields]
+    overhead = estimate_tokens(render((key, '') for key, _ in fields), model)
+    available = max(0, budget - overhead)
+
+    # Largest per-answer cap that fits: answers under it are kept whole
+    cap = 0
+    remaining = available
+    ordered = sorted(sizes)
+    for index, size in enumerate(ordered):
+        share = remaining // (len(ordered) - index)
+        if size > share:
+            cap = share
+            break
+        remaining -= size
+    else:
+        cap = ordered[-1] if ordered else 0
+
+    compiled = []
+    truncated_fields = []
+    for (key, value), size in zip(fields, sizes):
+        if size > cap:
+            value = _truncate(value, cap, model)
+            truncated_fields.append(key)
+        compiled.append((key, value))
+
+    text = render(compiled)
+    return CompiledPrompt(text, estimate_tokens(text, model), original_tokens, budget, truncated_fields)
@@ -0,0 +1,168 @@
+"""
+Search Helpers - Full-text search over onboarding sessions
+
+Each OnboardingSession keeps a plain-text `search_document` (identifiers,
+client and every step answer) up to date on save. The database indexes it:
+
+- PostgreSQL: a stored generated `search_vector` tsvector column with a GIN index
+- SQLite: an external-content FTS5 table (`session_search`, the unmanaged
+  SessionSearch model) kept in sync by triggers
+
+Both are created by migration 0011, which keeps its own frozen copy of
+the DDL below and fills in the documents of existing sessions. The SQLite
+triggers are re-checked after every migrate, since table rebuilds drop
+them; any other backend falls back to icontains on the document.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Lookup, Q
+from django.db.models.expressions import RawSQL
+
+from .models import OnboardingSession, SessionSearch
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'session_search'
+# Words, plus the characters that hold emails and session ids together
+TERM_RE = re.compile(r"[\w@.+-]+", re.UNICODE)
+
+
+# Idempotent DDL for the search index, per database vendor
+SEARCH_INDEX_SQL = {
+    'postgresql': [
+        """ALTER TABLE "myApp_onboardingsession" ADD COLUMN IF NOT EXISTS search_vector tsvector
+           GENERATED ALWAYS AS (to_tsvector('english'::regconfig, search_document)) STORED""",
+        'CREATE INDEX IF NOT EXISTS session_search_vector_idx ON "myApp_onboardingsession" USING gin (search_vector)',
+    ],
+    'sqlite': [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS session_search USING fts5(
+           search_document, content='myApp_onboardingsession', content_rowid='id',
+           tokenize='porter unicode61')""",
+        """CREATE TRIGGER IF NOT EXISTS session_search_ai AFTER INSERT ON "myApp_onboardingsession" BEGIN
+           INSERT INTO session_search(rowid, search_document) VALUES (new.id, new.search_document);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS session_search_ad AFTER DELETE ON "myApp_onboardingsession" BEGIN
+           INSERT INTO session_search(session_search, rowid, search_document) VALUES ('delete', old.id, old.search_document);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS session_search_au AFTER UPDATE OF search_document ON "myApp_onboardingsession" BEGIN
+           INSERT INTO session_search(session_search, rowid, search_document) VALUES ('delete', old.id, old.search_document);
+           INSERT INTO session_search(rowid, search_document) VALUES (new.id, new.search_document);
+           END""",
+    ],
+}
+DROP_SEARCH_INDEX_SQL = {
+    'postgresql': [
+        'DROP INDEX IF EXISTS session_search_vector_idx',
+        'ALTER TABLE "myApp_onboardingsession" DROP COLUMN IF EXISTS search_vector',
+    ],
+    'sqlite': [
+        'DROP TRIGGER IF EXISTS session_search_ai',
+        'DROP TRIGGER IF EXISTS session_search_ad',
+        'DROP TRIGGER IF EXISTS session_search_au',
+        'DROP TABLE IF EXISTS session_search',
+    ],
+}
+
+
+def create_search_index(conn=connection):
+    """Create the vendor's search index (no-op if present or unsupported)"""
+    with conn.cursor() as cursor:
+        for statement in SEARCH_INDEX_SQL.get(conn.vendor, []):
+            cursor.execute(statement)
+
+
+def drop_search_index(conn=connection):
+    with conn.cursor() as cursor:
+        for statement in DROP_SEARCH_INDEX_SQL.get(conn.vendor, []):
+            cursor.execute(statement)
+
+
+def rebuild_fts_table(conn=connection):
+    """Re-read every search_document into the SQLite FTS5 table"""
+    if conn.vendor == 'sqlite':
+        with conn.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+class Match(Lookup):
+    """FTS5 `column MATCH query` (registered on SessionSearch.search_document only)"""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+SessionSearch._meta.get_field('search_document').register_lookup(Match)
+
+
+def search_terms(query):
+    """Search words from user input (punctuation-only fragments dropped)"""
+    terms = [term.strip('.+-@') for term in TERM_RE.findall(query or '')]
+    return [term for term in terms if term][:16]
+
+
+def _tsquery(terms):
+    """to_tsquery text: every term must match, each as a prefix"""
+    return ' & '.join("'{}':*".format(term.replace("'", "''").replace('\\', '')) for term in terms)
+
+
+def _fts5_query(terms):
+    """FTS5 MATCH text: every term must match, each as a prefix"""
+    return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_sessions(sessions, query):
+    """
+    Filter `sessions` to those matching every word of `query` (prefix
+    matches, so partial words work while typing) and annotate `search_rank`
+    (higher is better). Session ids and emails are indexed like any other words.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return sessions
+
+    if connection.vendor == 'postgresql':
+        table = connection.ops.quote_name(OnboardingSession._meta.db_table)
+        tsquery = _tsquery(terms)
+        match = RawSQL(
+            f'{table}.search_vector @@ to_tsquery(%s::regconfig, %s)',
+            [SEARCH_CONFIG, tsquery], output_field=BooleanField()
+        )
+        rank = RawSQL(
+            f'ts_rank_cd({table}.search_vector, to_tsquery(%s::regconfig, %s))',
+            [SEARCH_CONFIG, tsquery], output_field=FloatField()
+        )
+        return sessions.filter(match).annotate(search_rank=rank)
+
+    if connection.vendor == 'sqlite':
+        # Join the FTS table (MATCH drives the query); bm25 rank is lower-is-better
+        return sessions.filter(
+            search_entry__search_document__match=_fts5_query(terms)
+        ).annotate(search_rank=-F('search_entry__rank'))
+
+    match = Q()
+    for term in terms:
+        match &= Q(search_document__icontains=term)
+    return sessions.filter(match)
+
+
+def refresh_search_documents(sessions, batch_size=500):
+    """
+    Rebuild search_document for `sessions` without touching updated_at or
+    revision. Returns the number of rows whose document changed.
+    """
+    changed = []
+    updated = 0
+    for session in sessions.select_related('client').iterator(chunk_size=batch_size):
+        document = session.get_search_document()
+        if document != session.search_document:
+            session.search_document = document
+            changed.append(session)
+        if len(changed) >= batch_size:
+            updated += OnboardingSession.objects.bulk_update(changed, ['search_document'])
+            changed = []
+    if changed:
+        updated += OnboardingSession.objects.bulk_update(changed, ['search_document'])
+    return updated
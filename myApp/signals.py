@@ -0,0 +1,53 @@
+"""
+Signals - Keep cached website content and session search in sync with database edits
+"""
+from django.db import connections
+from django.db.models.signals import post_save, post_delete, post_migrate
+
+from .models import (
+    Client, OnboardingSession, SEO, WebsiteHero, WebsiteSection, WebsiteTestimonial, WebsiteFooter
+)
+from .content_helpers import bump_content_version
+from .dashboard_helpers import invalidate_dashboard_kpis
+from .search_helpers import FTS_TABLE, create_search_index, refresh_search_documents
+
+WEBSITE_CONTENT_MODELS = (SEO, WebsiteHero, WebsiteSection, WebsiteTestimonial, WebsiteFooter)
+
+
+def invalidate_website_content(sender, **kwargs):
+    """Bump the homepage content version on any dashboard or admin edit"""
+    bump_content_version()
+
+
+for model in WEBSITE_CONTENT_MODELS:
+    post_save.connect(invalidate_website_content, sender=model, dispatch_uid=f'website_content_save_{model.__name__}')
+    post_delete.connect(invalidate_website_content, sender=model, dispatch_uid=f'website_content_delete_{model.__name__}')
+
+
+def invalidate_session_counts(sender, created=False, update_fields=None, **kwargs):
+    """Drop cached dashboard counts when a session is created, deleted or changes status"""
+    if created or update_fields is None or 'status' in update_fields:
+        invalidate_dashboard_kpis()
+
+
+post_save.connect(invalidate_session_counts, sender=OnboardingSession, dispatch_uid='dashboard_kpis_save')
+post_delete.connect(invalidate_session_counts, sender=OnboardingSession, dispatch_uid='dashboard_kpis_delete')
+
+
+def refresh_client_sessions_search(sender, instance, created=False, **kwargs):
+    """Client name and email are part of each of their sessions' search document"""
+    if not created:
+        refresh_search_documents(instance.sessions.all())
+
+
+post_save.connect(refresh_client_sessions_search, sender=Client, dispatch_uid='client_session_search')
+
+
+def ensure_search_index(sender, using='default', **kwargs):
+    """SQLite drops triggers when a migration rebuilds the sessions table; put them back"""
+    connection = connections[using]
+    if sender.name == 'myApp' and connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+        create_search_index(connection)
+
+
+post_migrate.connect(ensure_search_index, dispatch_uid='session_search_index')
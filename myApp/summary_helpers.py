@@ -0,0 +1,132 @@
+"""
+Summary Helpers - Blueprint summary prompt and generation for onboarding sessions
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .ai_helpers import get_openai_client
+from .prompt_compiler import compile_blueprint, estimate_tokens
+
+SUMMARY_MODEL = "gpt-4"
+SUMMARY_PARAMS = {'temperature': 0.7, 'max_tokens': 500}
+# Bump when the summary prompt changes so stored summaries count as stale
+SUMMARY_PROMPT_VERSION = 2
+
+
+def normalize_blueprint(value):
+    """Strip string whitespace and drop empty values so cosmetic edits hash the same"""
+    if isinstance(value, dict):
+        normalized = {key: normalize_blueprint(item) for key, item in value.items()}
+        return {key: item for key, item in normalized.items() if item not in (None, '', [], {})}
+    if isinstance(value, list):
+        normalized = [normalize_blueprint(item) for item in value]
+        return [item for item in normalized if item not in (None, '', [], {})]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def ai_input_hash(session, model, prompt_version):
+    """
+    Fingerprint of everything an AI field of the session is generated from:
+    the normalized step data plus the model/parameters and prompt version.
+    """
+    payload = json.dumps(
+        {
+            'model': model,
+            'prompt_version': prompt_version,
+            'data': normalize_blueprint(session.get_all_data()),
+        },
+        sort_keys=True, separators=(',', ':'), cls=DjangoJSONEncoder,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def summary_input_hash(session):
+    """ai_summary_hash value for a summary generated now"""
+    if getattr(settings, 'OPENAI_API_KEY', None):
+        model = f"{SUMMARY_MODEL}:{json.dumps(SUMMARY_PARAMS, sort_keys=True)}:{get_summary_token_budget()}"
+    else:
+        model = 'fallback'
+    return ai_input_hash(session, model, SUMMARY_PROMPT_VERSION)
+
+
+def is_summary_current(session, input_hash=None):
+    """True when the stored summary was generated from the session's current data"""
+    if input_hash is None:
+        input_hash = summary_input_hash(session)
+    return bool(session.ai_summary) and session.ai_summary_hash == input_hash
+
+
+def get_summary_token_budget():
+    """Token budget for the blueprint data in a summary prompt"""
+    return getattr(settings, 'AI_SUMMARY_INPUT_TOKEN_BUDGET', 2000)
+
+
+def summary_prompt(session):
+    """
+    Chat messages asking for a blueprint summary of the session, plus
+    prompt token stats (the blueprint is compiled to fit the token budget).
+    """
+    compiled = compile_blueprint(session.get_all_data(), get_summary_token_budget(), SUMMARY_MODEL)
+
+    prompt = f"""Based on this course onboarding data, create a concise 1-2 paragraph summary that includes:
+- Who the course is for (target audience)
+- Main promise/transformation
+- Format and structure
+- Key outcomes
+- Any risks or questions if fields look weak
+
+Onboarding Data (one "step.field: answer" per line; [N files] are uploads, answers ending in … were shortened):
+{compiled.text}
+
+Provide a professional, clear summary:"""
+
+    messages = [
+        {"role": "system", "content": "You are a course architect assistant. Create clear, professional summaries of course blueprints."},
+        {"role": "user", "content": prompt}
+    ]
+    stats = compiled.stats()
+    stats['prompt_tokens'] = sum(estimate_tokens(message['content'], SUMMARY_MODEL) for message in messages)
+    return messages, stats
+
+
+def summary_messages(session):
+    """Chat messages asking for a blueprint summary of the session"""
+    return summary_prompt(session)[0]
+
+
+def fallback_summary(session):
+    """Summary built from the denormalized fields when OpenAI is not configured"""
+    return f"Course Blueprint Summary\n\nTarget Audience: {session.audience_summary or 'Not specified'}\n\nMain Transformation: {session.main_outcomes or 'Not specified'}\n\nCourse Title: {session.course_title or 'Not specified'}\n\n[AI summary generation requires OPENAI_API_KEY]"
+
+
+def generate_session_summary(session):
+    """Summary text for the session (blocks on the OpenAI call)"""
+    if not getattr(settings, 'OPENAI_API_KEY', None):
+        return fallback_summary(session)
+
+    response = get_openai_client().chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=summary_messages(session),
+        **SUMMARY_PARAMS
+    )
+    return response.choices[0].message.content.strip()
+
+
+def get_or_generate_summary(session, force=False):
+    """
+    Return (summary, cached). The stored summary is reused when its input
+    hash still matches; otherwise a new one is generated and saved.
+    """
+    input_hash = summary_input_hash(session)
+    if not force and is_summary_current(session, input_hash):
+        return session.ai_summary, True
+
+    session.ai_summary = generate_session_summary(session)
+    session.ai_summary_hash = input_hash
+    session.save(update_fields=['ai_summary', 'ai_summary_hash', 'updated_at'])
+    return session.ai_summary, False
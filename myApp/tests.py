@@ -1,3 +1,1073 @@
-from django.test import TestCase
+import asyncio
+import csv
+import importlib.util
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from . import ai_jobs, autosave_buffer, instrumentation
+from .ai_helpers import PromptCache, ai_help_cache, cached_completion, get_async_openai_client
+from .client_helpers import resolve_client
+from .dashboard_helpers import DASHBOARD_KPIS_KEY, get_dashboard_kpis
+from .media_helpers import content_hash, folder_facets, iter_media_uploads, search_assets
+from .models import AIJob, Client, MediaAsset, OnboardingSession
+from .prompt_compiler import compile_blueprint, estimate_tokens
+from .search_helpers import search_sessions
+from .utils import upload_pipeline
+from .utils.cloudinary_utils import smart_compress_to_bytes, stub_upload_bytes
+from .views import dashboard_generate_ai_summary_async, onboarding_ai_help_async
+
+
+class FakeLLMServer:
+    """
+    Local stand-in for the OpenAI chat completions API (point OPENAI_BASE_URL at `url`).
+    Replies with `reply` after `delay` seconds, or with `status` if it is not 200,
+    and records how many requests were in flight at once.
+    """
+
+    def __init__(self):
+        self.reset()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                with server.lock:
+                    server.requests += 1
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    time.sleep(server.delay)
+                    body = json.dumps({
+                        'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0, 'model': 'fake',
+                        'choices': [{'index': 0, 'finish_reason': 'stop',
+                                     'message': {'role': 'assistant', 'content': server.reply}}],
+                    }).encode()
+                    self.send_response(server.status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up (timeout test)
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/v1'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def reset(self):
+        self.lock = threading.Lock()
+        self.reply = 'A complete, usable suggestion that is long enough to pass the quality check.'
+        self.status = 200
+        self.delay = 0
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class AsyncAIEndpointTests(TestCase):
+    """onboarding_ai_help_async and dashboard_generate_ai_summary_async against FakeLLMServer"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeLLMServer()
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.reset()
+        ai_help_cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.use_settings(OPENAI_API_KEY='test-key', OPENAI_BASE_URL=self.server.url,
+                          AI_REQUEST_TIMEOUT=5, AI_MAX_CONCURRENCY=50)
+
+    def use_settings(self, **kwargs):
+        override = override_settings(**kwargs)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def ai_help(self, field_type='pitch', **context):
+        request = self.factory.post(
+            '/api/onboarding/ai-help/',
+            json.dumps({'field_type': field_type, 'context': context}),
+            content_type='application/json',
+        )
+        return onboarding_ai_help_async(request)
+
+    async def generate_summary(self, session):
+        user = await sync_to_async(User.objects.create_user)(f'staff{session.id}', password='pw', is_staff=True)
+
+        async def auser():
+            return user
+
+        request = self.factory.post(f'/dashboard/sessions/{session.id}/generate-summary/')
+        request.user = user
+        request.auser = auser
+        return await dashboard_generate_ai_summary_async(request, session.id)
+
+    async def test_ai_help_returns_model_reply(self):
+        response = await self.ai_help(topic='Pottery')
+        data = json.loads(response.content)
+        self.assertTrue(data['success'])
+        self.assertEqual(data['suggestions'], [self.server.reply])
+        self.assertEqual(self.server.requests, 1)
+
+    async def test_ai_help_calls_are_capped_by_semaphore(self):
+        self.use_settings(AI_MAX_CONCURRENCY=2)
+        self.server.delay = 0.2
+        # Distinct prompts, so the prompt cache cannot coalesce them
+        responses = await asyncio.gather(*(self.ai_help(topic=f'Topic {i}') for i in range(6)))
+        self.assertTrue(all(json.loads(r.content)['success'] for r in responses))
+        self.assertEqual(self.server.requests, 6)
+        self.assertEqual(self.server.max_active, 2)
+
+    async def test_ai_help_identical_prompts_share_one_call(self):
+        self.server.delay = 0.2
+        responses = await asyncio.gather(*(self.ai_help(topic='Same') for _ in range(4)))
+        self.assertEqual({json.loads(r.content)['suggestions'][0] for r in responses}, {self.server.reply})
+        self.assertEqual(self.server.requests, 1)
+
+    async def test_ai_help_falls_back_when_upstream_fails(self):
+        self.server.status = 500
+        data = json.loads((await self.ai_help('course_title', topic='Pottery')).content)
+        self.assertTrue(data['success'])
+        self.assertEqual(data['suggestions'][0], 'Master Pottery: A Complete Guide')
+
+    async def test_ai_help_falls_back_on_timeout(self):
+        self.use_settings(AI_REQUEST_TIMEOUT=0.2)
+        self.server.delay = 1
+        data = json.loads((await self.ai_help('course_title', topic='Pottery')).content)
+        self.assertTrue(data['success'])
+        self.assertEqual(data['suggestions'][0], 'Master Pottery: A Complete Guide')
+
+    async def test_async_client_is_reused_within_a_loop(self):
+        client = get_async_openai_client()
+        self.assertIs(get_async_openai_client(), client)
+        self.use_settings(AI_REQUEST_TIMEOUT=1)
+        self.assertIsNot(get_async_openai_client(), client)
+
+    async def test_summary_is_generated_and_stored(self):
+        session = await OnboardingSession.objects.acreate(session_id='s1', course_title='Pottery')
+        response = await self.generate_summary(session)
+        data = json.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['summary'], self.server.reply)
+        self.assertFalse(data['cached'])
+        await session.arefresh_from_db()
+        self.assertEqual(session.ai_summary, self.server.reply)
+
+    async def test_summary_timeout_returns_504(self):
+        self.use_settings(AI_REQUEST_TIMEOUT=0.2)
+        self.server.delay = 1
+        session = await OnboardingSession.objects.acreate(session_id='s2')
+        response = await self.generate_summary(session)
+        self.assertEqual(response.status_code, 504)
+        await session.arefresh_from_db()
+        self.assertEqual(session.ai_summary, '')
+
+    async def test_summary_without_api_key_uses_fallback(self):
+        self.use_settings(OPENAI_API_KEY='')
+        session = await OnboardingSession.objects.acreate(session_id='s3', course_title='Pottery')
+        data = json.loads((await self.generate_summary(session)).content)
+        self.assertIn('Course Title: Pottery', data['summary'])
+        self.assertEqual(self.server.requests, 0)
+
+
+class StubOpenAIClient:
+    """Offline stand-in for openai.OpenAI: counts calls and returns `reply`"""
+
+    def __init__(self, reply='Stub reply', error=None):
+        self.reply = reply
+        self.error = error
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f' {self.reply} '))])
+
+
+class PromptCacheTests(SimpleTestCase):
+    """PromptCache and cached_completion, offline against StubOpenAIClient"""
+
+    def setUp(self):
+        self.stub = StubOpenAIClient()
+        patcher = mock.patch('myApp.ai_helpers.get_openai_client', return_value=self.stub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def complete(self, cache, prompt='Suggest a title'):
+        return cached_completion('gpt-4o-mini', [{'role': 'user', 'content': prompt}], cache=cache, max_tokens=10)
+
+    def test_identical_prompts_are_served_from_cache(self):
+        cache = PromptCache()
+        self.assertEqual(self.complete(cache), 'Stub reply')
+        self.assertEqual(self.complete(cache), 'Stub reply')
+        self.complete(cache, 'Another prompt')
+        self.assertEqual(self.stub.calls, 2)
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (1, 2))
+
+    def test_entries_expire_after_ttl(self):
+        cache = PromptCache(ttl=60)
+        with mock.patch('myApp.ai_helpers.time.monotonic', return_value=1000.0):
+            self.complete(cache)
+        with mock.patch('myApp.ai_helpers.time.monotonic', return_value=1059.0):
+            self.complete(cache)
+        self.assertEqual(self.stub.calls, 1)
+        with mock.patch('myApp.ai_helpers.time.monotonic', return_value=1061.0):
+            self.complete(cache)
+        self.assertEqual(self.stub.calls, 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = PromptCache(max_entries=2)
+        self.complete(cache, 'a')
+        self.complete(cache, 'b')
+        self.complete(cache, 'a')  # a is now the most recently used
+        self.complete(cache, 'c')  # evicts b
+        self.assertEqual(self.stub.calls, 3)
+        self.complete(cache, 'a')
+        self.assertEqual(self.stub.calls, 3)
+        self.complete(cache, 'b')
+        self.assertEqual(self.stub.calls, 4)
+        self.assertEqual(cache.stats()['evictions'], 2)
+
+    def test_errors_propagate_and_are_not_cached(self):
+        cache = PromptCache()
+        self.stub.error = RuntimeError('upstream down')
+        with self.assertRaisesMessage(RuntimeError, 'upstream down'):
+            self.complete(cache)
+        self.stub.error = None
+        self.assertEqual(self.complete(cache), 'Stub reply')
+        self.assertEqual(self.stub.calls, 2)
+        self.assertEqual(cache.stats()['entries'], 1)
+
+    def test_concurrent_misses_share_one_call(self):
+        cache = PromptCache()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_call():
+            started.set()
+            release.wait(5)
+            return 'shared'
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(cache.get_or_call('key', slow_call)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(cache.get_or_call('key', slow_call)))
+            for _ in range(4)
+        ]
+        for thread in followers:
+            thread.start()
+        while cache.stats()['coalesced'] < 4:
+            time.sleep(0.01)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+        self.assertEqual(results, ['shared'] * 5)
+        self.assertEqual((cache.stats()['misses'], cache.stats()['coalesced']), (1, 4))
+
+    def test_waiters_receive_the_leaders_error(self):
+        cache = PromptCache()
+        started = threading.Event()
+        release = threading.Event()
+
+        def failing_call():
+            started.set()
+            release.wait(5)
+            raise ValueError('bad prompt')
+
+        errors = []
+
+        def call():
+            try:
+                cache.get_or_call('key', failing_call)
+            except ValueError as e:
+                errors.append(str(e))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=call)
+        follower.start()
+        while cache.stats()['coalesced'] < 1:
+            time.sleep(0.01)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+        self.assertEqual(errors, ['bad prompt', 'bad prompt'])
+        self.assertEqual(cache.stats()['entries'], 0)
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        instrumentation._buffer.clear()
+        self.addCleanup(instrumentation._buffer.clear)
+
+    def test_sync_request_queries_are_recorded(self):
+        def view(request):
+            list(OnboardingSession.objects.all())
+            list(OnboardingSession.objects.filter(status='new'))
+            return HttpResponse('ok')
+
+        middleware = instrumentation.RequestMetricsMiddleware(view)
+        self.assertFalse(iscoroutinefunction(middleware))
+        middleware(RequestFactory().get('/x/'))
+        entry = instrumentation.recent_requests()[0]
+        self.assertEqual((entry['path'], entry['queries'], entry['writes']), ('/x/', 2, 0))
+
+    async def test_async_view_stays_on_the_event_loop(self):
+        seen = {}
+
+        async def view(request):
+            seen['loop'] = asyncio.get_running_loop()
+            await OnboardingSession.objects.acount()
+            return HttpResponse('ok')
+
+        # Built in the ORM thread, like the handler at startup, so its open connection is instrumented
+        middleware = await sync_to_async(instrumentation.RequestMetricsMiddleware)(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(AsyncRequestFactory().get('/async/'))
+        self.assertIs(seen['loop'], asyncio.get_running_loop())
+        entry = instrumentation.recent_requests()[0]
+        self.assertEqual((entry['path'], entry['queries']), ('/async/', 1))
+
+    def test_queries_outside_a_request_are_not_recorded(self):
+        instrumentation.RequestMetricsMiddleware(lambda request: HttpResponse('ok'))
+        list(OnboardingSession.objects.all())
+        self.assertEqual(instrumentation.recent_requests(), [])
+
+
+class RequestMetricsEndpointTests(TestCase):
+    def test_staff_endpoint_reports_prompt_cache_stats(self):
+        ai_help_cache.clear()
+        user = User.objects.create_user('staff', password='pw', is_staff=True)
+        self.client.force_login(user)
+        data = self.client.get('/dashboard/metrics/').json()
+        self.assertEqual(data['ai_help_cache']['hits'], 0)
+        self.assertIn('coalesced', data['ai_help_cache'])
+
+
+@override_settings(AI_JOB_MAX_ATTEMPTS=3, AI_JOB_RETRY_BASE_SECONDS=30, AI_JOB_RETRY_MAX_SECONDS=100)
+class AIJobRetryTests(TestCase):
+    def setUp(self):
+        self.session = OnboardingSession.objects.create(session_id='retry')
+        self.job = AIJob.objects.create(kind='client_reconcile', session=self.session)
+
+    def fail_next_run(self):
+        job = ai_jobs.claim_next('test-worker')
+        with mock.patch.dict(ai_jobs.JOB_RUNNERS, {'client_reconcile': mock.Mock(side_effect=RuntimeError('boom'))}):
+            self.assertFalse(ai_jobs.run_job(job))
+        job.refresh_from_db()
+        return job
+
+    def test_retry_delay_doubles_up_to_the_cap(self):
+        self.assertEqual([ai_jobs.retry_delay(n) for n in (1, 2, 3, 4)], [30, 60, 100, 100])
+
+    def test_failed_job_is_not_claimed_until_its_backoff_passes(self):
+        job = self.fail_next_run()
+        self.assertEqual((job.status, job.error), ('queued', 'boom'))
+        self.assertAlmostEqual((job.run_after - timezone.now()).total_seconds(), 30, delta=5)
+        self.assertIsNone(ai_jobs.claim_next('test-worker'))
+
+        AIJob.objects.filter(id=job.id).update(run_after=timezone.now())
+        job = self.fail_next_run()
+        self.assertAlmostEqual((job.run_after - timezone.now()).total_seconds(), 60, delta=5)
+
+        AIJob.objects.filter(id=job.id).update(run_after=timezone.now())
+        job = self.fail_next_run()
+        self.assertEqual(job.status, 'failed')
+
+    def test_stale_running_job_is_requeued(self):
+        ai_jobs.claim_next('crashed-worker')
+        AIJob.objects.filter(id=self.job.id).update(started_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(ai_jobs.requeue_stale(60), (1, 0))
+        self.assertEqual(ai_jobs.claim_next('test-worker').id, self.job.id)
+
+
+def save_onboarding(client, **data):
+    return client.post('/api/onboarding/save/', json.dumps(data), content_type='application/json')
+
+
+class ClientReconcileTests(TestCase):
+    meet_you = {'full_name': 'Ada Lovelace', 'email': ' Ada@Example.com ', 'brand_name': 'Engines'}
+
+    def save(self, **data):
+        return save_onboarding(self.client, **data).json()
+
+    def test_submitted_session_is_linked_to_a_client_without_a_worker(self):
+        self.assertFalse(settings.AI_JOB_QUEUE_ENABLED)
+        data = self.save(session_id='inline', steps={'meet_you': self.meet_you}, submit=True)
+        self.assertTrue(data['success'])
+        session = OnboardingSession.objects.get(session_id='inline')
+        self.assertEqual(session.status, 'submitted')
+        self.assertEqual(session.client.email_normalized, 'ada@example.com')
+        self.assertFalse(AIJob.objects.exists())
+
+    @override_settings(CLIENT_RECONCILE_QUEUED=True)
+    def test_queued_reconcile_links_the_client_when_the_worker_runs(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.save(session_id='queued', steps={'meet_you': self.meet_you}, submit=True)
+        self.assertIsNone(OnboardingSession.objects.get(session_id='queued').client)
+        job = ai_jobs.claim_next('test-worker')
+        self.assertEqual(job.kind, 'client_reconcile')
+        self.assertTrue(ai_jobs.run_job(job))
+        self.assertEqual(OnboardingSession.objects.get(session_id='queued').client.full_name, 'Ada Lovelace')
+
+    def test_clients_are_resolved_by_normalized_email(self):
+        first = resolve_client(self.meet_you)
+        second = resolve_client({'full_name': 'Ada King', 'email': 'ADA@example.com', 'phone': '555'})
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(Client.objects.count(), 1)
+        second.refresh_from_db()
+        # Blank answers keep existing details, filled ones replace them
+        self.assertEqual((second.full_name, second.brand_name, second.phone), ('Ada King', 'Engines', '555'))
+        self.assertIsNone(resolve_client({'email': 'ada@example.com'}))
+
+    def test_merge_clients_folds_duplicates_into_the_indexed_row(self):
+        keeper = Client.objects.create(full_name='Ada', email='ada@example.com')
+        duplicate = Client.objects.create(full_name='Ada L', email='other@example.com', phone='555')
+        # A legacy duplicate from before the unique index
+        Client.objects.filter(pk=duplicate.pk).update(email='ADA@example.com ', email_normalized=None)
+        session = OnboardingSession.objects.create(session_id='dup', client=duplicate)
+
+        call_command('merge_clients', stdout=StringIO())
+        self.assertEqual(list(Client.objects.values_list('id', flat=True)), [keeper.id])
+        keeper.refresh_from_db()
+        session.refresh_from_db()
+        self.assertEqual((keeper.phone, session.client_id), ('555', keeper.id))
+
+
+class SessionSearchTests(TestCase):
+    def search(self, query):
+        return list(search_sessions(OnboardingSession.objects.all(), query).values_list('session_id', flat=True))
+
+    def test_saved_session_is_found_by_prefix_of_every_word(self):
+        client = Client.objects.create(full_name='Grace Hopper', email='grace@navy.mil')
+        OnboardingSession.objects.create(
+            session_id='s-cobol', client=client, course_idea={'pitch': 'Teaching COBOL to everyone'}
+        )
+        OnboardingSession.objects.create(session_id='s-other', course_idea={'pitch': 'Pottery'})
+        self.assertEqual(self.search('cob hopper'), ['s-cobol'])
+        self.assertEqual(self.search('grace@navy.mil'), ['s-cobol'])
+        self.assertEqual(self.search('cobol pottery'), [])
+
+    def test_delta_save_update_reindexes_the_session(self):
+        session = OnboardingSession.objects.create(session_id='s-delta', course_idea={'pitch': 'Weaving'})
+        response = self.client.post('/api/onboarding/save/', json.dumps({
+            'session_id': 's-delta', 'mode': 'delta', 'base_revision': session.revision,
+            'changes': {'course_idea.pitch': 'Glassblowing'},
+        }), content_type='application/json')
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(self.search('glassblow'), ['s-delta'])
+        self.assertEqual(self.search('weaving'), [])
+
+
+class OnboardingSaveTests(TestCase):
+    def setUp(self):
+        self.session = OnboardingSession.objects.create(
+            session_id='s1', course_idea={'course_title': 'Pottery', 'format': 'video'}
+        )
+
+    def test_delta_save_merges_changed_paths(self):
+        response = save_onboarding(self.client, session_id='s1', mode='delta', base_revision=0, changes={
+            'course_idea.course_title': 'Wheel Throwing', 'course_idea.format': None, 'meet_you.full_name': 'Ada',
+        })
+        data = response.json()
+        self.assertEqual((data['revision'], data['saved_steps']), (1, ['course_idea', 'meet_you']))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.course_idea, {'course_title': 'Wheel Throwing'})
+        self.assertEqual((self.session.course_title, self.session.meet_you), ('Wheel Throwing', {'full_name': 'Ada'}))
+
+    def test_delta_save_on_stale_revision_is_a_conflict(self):
+        OnboardingSession.objects.filter(pk=self.session.pk).update(revision=3)
+        response = save_onboarding(self.client, session_id='s1', mode='delta', base_revision=2,
+                                   changes={'course_idea.course_title': 'Stale'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual((response.json()['conflict'], response.json()['revision']), (True, 3))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.course_idea['course_title'], 'Pottery')
+
+        response = save_onboarding(self.client, session_id='gone', mode='delta', base_revision=4, changes={})
+        self.assertEqual((response.status_code, response.json()['revision']), (409, None))
+
+    def test_full_save_sets_fields_and_none_removes_them(self):
+        with self.assertLogs('myApp.views', 'WARNING'):
+            data = save_onboarding(self.client, session_id='s1', steps={
+                'course_idea': {'course_title': 'Glaze', 'format': None}, 'bogus': {},
+            }).json()
+        self.assertEqual((data['revision'], data['warnings']), (1, ['Unknown step: bogus']))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.course_idea, {'course_title': 'Glaze'})
+
+
+@override_settings(ONBOARDING_AUTOSAVE_BUFFER_SECONDS=60)
+class AutosaveBufferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        patcher = mock.patch('myApp.autosave_buffer.is_shared_cache', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.session = OnboardingSession.objects.create(
+            session_id='s1', course_idea={'course_title': 'Pottery', 'format': 'video'}
+        )
+
+    def delta(self, revision, **changes):
+        return save_onboarding(self.client, session_id='s1', mode='delta', base_revision=revision, changes=changes)
+
+    def test_autosaves_are_coalesced_until_flushed(self):
+        self.assertEqual(self.delta(0, **{'course_idea.course_title': 'Clay'}).json()['revision'], 1)
+        data = save_onboarding(self.client, session_id='s1', steps={'course_idea': {'format': None, 'level': 'beginner'}}).json()
+        self.assertEqual((data['buffered'], data['revision']), (True, 2))
+        self.assertEqual(self.delta(2, **{'course_idea.course_title': 'Raku'}).json()['revision'], 3)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.revision, 0)
+        self.assertEqual(list(autosave_buffer.get_pending()), ['s1'])
+
+        self.assertEqual(autosave_buffer.flush_due(max_age=0), ['s1'])
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.revision, 3)
+        self.assertEqual(self.session.course_idea, {'course_title': 'Raku', 'level': 'beginner'})
+        self.assertEqual(self.session.course_title, 'Raku')
+        self.assertEqual(autosave_buffer.get_pending(), {})
+
+    def test_save_and_exit_writes_through(self):
+        data = save_onboarding(self.client, session_id='s1', mode='delta', base_revision=0, flush=True,
+                               changes={'course_idea.course_title': 'Clay'}).json()
+        self.assertEqual((data['buffered'], data['revision']), (False, 1))
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.revision, self.session.course_title), (1, 'Clay'))
+
+    def test_buffered_changes_never_overwrite_a_newer_direct_save(self):
+        self.delta(0, **{'course_idea.course_title': 'Buffered'})
+        # A submit elsewhere wrote the session directly after the change was buffered
+        OnboardingSession.objects.filter(pk=self.session.pk).update(
+            revision=5, course_idea={'course_title': 'Direct'}
+        )
+        with self.assertLogs('myApp.autosave_buffer', 'WARNING'):
+            self.assertFalse(autosave_buffer.flush('s1'))
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.revision, self.session.course_idea), (5, {'course_title': 'Direct'}))
+
+        response = self.delta(1, **{'course_idea.course_title': 'Stale'})
+        self.assertEqual((response.status_code, response.json()['revision']), (409, 5))
+        self.assertEqual(self.delta(5, **{'course_idea.course_title': 'Fresh'}).json()['revision'], 6)
+
+    def test_forced_flush_reports_a_conflict(self):
+        self.delta(0, **{'course_idea.course_title': 'Buffered'})
+        OnboardingSession.objects.filter(pk=self.session.pk).update(revision=5)
+        with self.assertLogs('myApp.autosave_buffer', 'WARNING'):
+            response = save_onboarding(self.client, session_id='s1', mode='delta', base_revision=1, flush=True,
+                                       changes={'course_idea.format': 'live'})
+        self.assertEqual((response.status_code, response.json()['revision']), (409, 5))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.course_idea, {'course_title': 'Pottery', 'format': 'video'})
+
+
+class StaffClientMixin:
+    def setUp(self):
+        super().setUp()
+        self.staff = User.objects.create_user('reviewer', password='pw', is_staff=True)
+        self.client.force_login(self.staff)
+
+
+class StepsMaskTests(StaffClientMixin, TestCase):
+    def test_save_sets_the_bits_of_steps_with_data(self):
+        session = OnboardingSession.objects.create(
+            session_id='s1', meet_you={'full_name': 'Ada'}, platform_money={'price_point': '99'}
+        )
+        meet_you, platform_money = OnboardingSession.step_bit('meet_you'), OnboardingSession.step_bit('platform_money')
+        self.assertEqual((session.steps_mask, session.steps_completed), (meet_you | platform_money, 2))
+
+        session.meet_you = {}
+        session.course_idea = {'course_title': 'Pottery'}
+        session.save(update_fields=['meet_you', 'course_idea'])
+        session.refresh_from_db()
+        self.assertEqual(session.steps_mask, OnboardingSession.step_bit('course_idea') | platform_money)
+        self.assertTrue(session.is_step_complete('course_idea'))
+        self.assertFalse(session.is_step_complete('meet_you'))
+        self.assertEqual(session.steps_completed, 2)
+
+    def test_missing_step_filter_tests_the_bit(self):
+        OnboardingSession.objects.create(session_id='has', course_idea={'course_title': 'Pottery'})
+        OnboardingSession.objects.create(session_id='lacks', meet_you={'full_name': 'Ada'})
+        data = self.client.get('/dashboard/api/sessions/', {'missing_step': 'course_idea'}).json()
+        self.assertEqual([row['session_id'] for row in data['sessions']], ['lacks'])
+
+
+def make_asset(title, folder='katek_ai/uploads', **fields):
+    return MediaAsset.objects.create(
+        title=title, folder=folder, cloudinary_url=f'https://res.example.com/{folder}/{title}.jpg', **fields
+    )
+
+
+class MediaGalleryTests(StaffClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        make_asset('Homepage hero', folder='website')
+        make_asset('Hero banner', folder='website')
+        make_asset('Superhero cape')
+        make_asset('Team photo')
+
+    def titles(self, assets):
+        return sorted(asset.title for asset in assets)
+
+    def test_search_matches_title_and_word_prefixes(self):
+        self.assertEqual(self.titles(search_assets(MediaAsset.objects.all(), ' hero ')), ['Hero banner', 'Homepage hero'])
+        self.assertEqual(self.titles(search_assets(MediaAsset.objects.all(), 'pho')), ['Team photo'])
+        self.assertEqual(search_assets(MediaAsset.objects.all(), '').count(), 4)
+
+    def test_folder_facets_count_the_filtered_assets(self):
+        self.assertEqual(folder_facets(MediaAsset.objects.all()), [
+            {'folder': 'katek_ai/uploads', 'count': 2}, {'folder': 'website', 'count': 2},
+        ])
+        self.assertEqual(folder_facets(search_assets(MediaAsset.objects.all(), 'hero')), [{'folder': 'website', 'count': 2}])
+
+    def test_gallery_api_pages_with_a_cursor(self):
+        url = '/website-dashboard/gallery/api/'
+        first = self.client.get(url, {'limit': 3}).json()
+        self.assertEqual((first['count'], first['has_more'], first['facets']['total']), (3, True, 4))
+        second = self.client.get(url, {'limit': 3, 'cursor': first['next_cursor']}).json()
+        self.assertEqual((second['count'], second['has_more'], second['facets']), (1, False, None))
+        seen = [image['id'] for image in first['images'] + second['images']]
+        self.assertEqual(seen, list(MediaAsset.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+        data = self.client.get(url, {'q': 'hero', 'folder': 'website'}).json()
+        self.assertEqual(sorted(image['title'] for image in data['images']), ['Hero banner', 'Homepage hero'])
+
+
+def image_bytes(color, size=(64, 48), image_format='PNG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class CountingUploader:
+    """stub_upload_bytes that records the folders it uploaded to"""
+
+    def __init__(self):
+        self.folders = []
+        self.lock = threading.Lock()
+
+    def __call__(self, data, folder='katek_ai/uploads', **kwargs):
+        with self.lock:
+            self.folders.append(folder)
+        return stub_upload_bytes(data, folder=folder, **kwargs)
+
+
+@override_settings(UPLOAD_COMPRESS_PROCESSES=0, CLOUDINARY_STUB_LATENCY=0)
+class MediaDedupeTests(TestCase):
+    def test_stored_content_short_circuits_within_its_folder(self):
+        red, blue = image_bytes('red'), image_bytes('blue')
+        stored = make_asset('Red', folder='website', content_hash=content_hash(red))
+        uploader = CountingUploader()
+
+        results = sorted(iter_media_uploads(
+            [('red.png', red), ('red-again.png', red), ('blue.png', blue)], folder='website', uploader=uploader
+        ), key=lambda result: result.index)
+        self.assertEqual([result.duplicate for result in results], [True, True, False])
+        self.assertEqual([result.existing for result in results], [stored, stored, None])
+        self.assertEqual(uploader.folders, ['website'])
+
+        # Another folder gets its own asset; repeats within the batch upload once
+        results = list(iter_media_uploads([('red.png', red), ('red-again.png', red)], folder='blog', uploader=uploader))
+        self.assertEqual(sorted(result.duplicate for result in results), [False, True])
+        self.assertEqual(uploader.folders, ['website', 'blog'])
+
+    def test_perceptual_matches_are_only_merged_with_apply(self):
+        make_asset('Template A', content_hash='a' * 64, perceptual_hash='f0f0f0f0f0f0f0f0')
+        make_asset('Template B', content_hash='b' * 64, perceptual_hash='f0f0f0f0f0f0f0f0')
+        out = StringIO()
+        call_command('dedupe_media', '--perceptual', stdout=out)
+        self.assertIn('re-run with --apply', out.getvalue())
+        self.assertEqual(MediaAsset.objects.count(), 2)
+
+        call_command('dedupe_media', '--perceptual', '--apply', stdout=StringIO())
+        self.assertEqual(list(MediaAsset.objects.values_list('title', flat=True)), ['Template A'])
+
+
+@override_settings(UPLOAD_COMPRESS_PROCESSES=0, CLOUDINARY_STUB_UPLOADS=True, CLOUDINARY_STUB_LATENCY=0)
+class ImageUploadViewTests(StaffClientMixin, TestCase):
+    url = '/website-dashboard/upload-image/'
+
+    def upload(self, **extra):
+        images = [
+            SimpleUploadedFile('red.png', image_bytes('red'), 'image/png'),
+            SimpleUploadedFile('red-copy.png', image_bytes('red'), 'image/png'),
+            SimpleUploadedFile('big.png', image_bytes('blue', size=(900, 700)), 'image/png'),
+        ]
+        return self.client.post(self.url, {'images[]': images, 'folder': 'website', **extra})
+
+    # Files over 1 KB are spooled to disk, so the pipeline reads the big one from its temporary path
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=1024)
+    def test_in_memory_and_spooled_uploads_are_stored_once_each(self):
+        with mock.patch('myApp.utils.upload_pipeline.read_source', wraps=upload_pipeline.read_source) as read_source:
+            data = self.upload().json()
+        self.assertTrue(data['success'])
+        self.assertEqual([result['duplicate'] for result in data['results']], [False, True, False])
+        self.assertEqual(MediaAsset.objects.filter(folder='website').count(), 2)
+        self.assertTrue(any(isinstance(call.args[0], str) for call in read_source.call_args_list))
+        self.assertIsNone(data['errors'])
+
+    def test_streamed_upload_reports_each_file(self):
+        response = self.upload(stream='1')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(lines), 4)
+        self.assertEqual((lines[-1]['done'], len(lines[-1]['assets'])), (True, 2))
+
+
+class DashboardKpiTests(StaffClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for index, status in enumerate(['new', 'new', 'in_review', 'completed']):
+            OnboardingSession.objects.create(session_id=f's{index}', status=status, course_title='Pottery')
+        OnboardingSession.objects.filter(status='in_review').update(updated_at=timezone.now() - timedelta(days=5))
+
+    def test_counts_come_from_one_query_then_the_cache(self):
+        with self.assertNumQueries(1):
+            kpis = get_dashboard_kpis()
+        self.assertEqual(kpis['pipeline'], {
+            'new': 2, 'in_review': 1, 'needs_clarification': 0, 'approved': 0, 'in_production': 0, 'completed': 1,
+        })
+        self.assertEqual((kpis['new_this_week'], kpis['old_review_sessions'], kpis['incomplete_sessions']), (4, 1, 4))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_dashboard_kpis(), kpis)
+
+    def test_status_changes_and_submits_invalidate_the_cache(self):
+        get_dashboard_kpis()
+        session = OnboardingSession.objects.get(session_id='s0')
+        self.client.post(f'/dashboard/sessions/{session.id}/update-status/', {'status': 'approved'})
+        self.assertIsNone(cache.get(DASHBOARD_KPIS_KEY))
+        self.assertEqual(get_dashboard_kpis()['pipeline']['approved'], 1)
+
+        # Delta submits write with update(), which sends no post_save
+        save_onboarding(self.client, session_id='s1', mode='delta', base_revision=0, changes={}, submit=True)
+        self.assertIsNone(cache.get(DASHBOARD_KPIS_KEY))
+        self.assertEqual(get_dashboard_kpis()['pipeline']['new'], 0)
+
+    def test_overview_page_renders_the_counts(self):
+        response = self.client.get('/dashboard/')
+        self.assertEqual((response.context['new_sessions'], response.context['in_review']), (2, 1))
+
+
+class SessionsCursorTests(StaffClientMixin, TestCase):
+    url = '/dashboard/api/sessions/'
+
+    def setUp(self):
+        super().setUp()
+        for index in range(7):
+            session = OnboardingSession.objects.create(session_id=f's{index}')
+            # Ties on steps_completed, so pages must break them by id (save() would recompute it)
+            OnboardingSession.objects.filter(pk=session.pk).update(steps_completed=index % 2)
+
+    def walk(self, sort):
+        ids, cursor = [], None
+        while True:
+            params = {'sort': sort, 'limit': 3, **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(self.url, params).json()
+            ids.extend(row['id'] for row in data['sessions'])
+            cursor = data['next_cursor']
+            if not data['has_more']:
+                return ids
+
+    def test_cursor_pages_cover_every_row_once_in_order(self):
+        for sort in ('-created_at', 'steps_completed', '-steps_completed'):
+            order = [sort, '-id' if sort.startswith('-') else 'id']
+            self.assertEqual(self.walk(sort), list(
+                OnboardingSession.objects.order_by(*order).values_list('id', flat=True)
+            ), sort)
+
+    def test_cursor_for_another_sort_or_tampered_is_rejected(self):
+        cursor = self.client.get(self.url, {'sort': 'created_at', 'limit': 2}).json()['next_cursor']
+        response = self.client.get(self.url, {'sort': '-created_at', 'cursor': cursor})
+        self.assertEqual((response.status_code, response.json()['error']), (400, 'Cursor does not match sort order'))
+        response = self.client.get(self.url, {'sort': 'created_at', 'cursor': cursor[:-2] + 'xx'})
+        self.assertEqual((response.status_code, response.json()['error']), (400, 'Invalid cursor'))
+
+
+class SessionsCsvExportTests(StaffClientMixin, TestCase):
+    def test_export_streams_filtered_rows(self):
+        client = Client.objects.create(full_name='Ada Lovelace', email='ada@example.com')
+        first = OnboardingSession.objects.create(session_id='s1', client=client, course_title='Engines', status='in_review')
+        OnboardingSession.objects.create(session_id='s2', status='new')
+
+        response = self.client.get('/dashboard/export/csv/', {'status': 'in_review'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:6], ['ID', 'Client', 'Email', 'Course Title', 'Status', 'Assignee'])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][:7], [str(first.id), 'Ada Lovelace', 'ada@example.com', 'Engines', 'In Review', 'Unassigned', '0'])
+
+
+class BlueprintExportTests(StaffClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = OnboardingSession.objects.create(
+            session_id='s1', status='submitted', course_idea={'course_title': 'Pottery', 'format': 'video'}
+        )
+        self.second = OnboardingSession.objects.create(session_id='s2', meet_you={'full_name': 'Ada'})
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def export(self, *args):
+        call_command('export_blueprints', *args, stderr=StringIO())
+
+    def read_ndjson(self, path):
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_endpoint_streams_flattened_steps_after_the_watermark(self):
+        response = self.client.get('/dashboard/export/blueprints/')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['session_id'] for row in rows], ['s1', 's2'])
+        self.assertEqual((rows[0]['course_idea.course_title'], rows[0]['course_idea.format']), ('Pottery', 'video'))
+        self.assertEqual(rows[1]['meet_you.full_name'], 'Ada')
+
+        response = self.client.get('/dashboard/export/blueprints/', {'updated_since': self.first.updated_at.isoformat()})
+        self.assertEqual([json.loads(line)['session_id'] for line in response.streaming_content], ['s2'])
+        self.assertEqual(self.client.get('/dashboard/export/blueprints/', {'updated_since': 'yesterday'}).status_code, 400)
+
+    def test_state_file_makes_the_next_export_incremental(self):
+        output = os.path.join(self.tmp.name, 'out.ndjson')
+        state = os.path.join(self.tmp.name, 'watermark')
+        self.export('--output', output, '--state-file', state)
+        self.assertEqual([row['session_id'] for row in self.read_ndjson(output)], ['s1', 's2'])
+        with open(state) as f:
+            self.assertEqual(f.read(), self.second.updated_at.isoformat())
+
+        self.first.course_idea = {'course_title': 'Raku'}
+        self.first.save()
+        self.export('--output', output, '--state-file', state)
+        rows = self.read_ndjson(output)
+        self.assertEqual([(row['session_id'], row['course_idea.course_title']) for row in rows], [('s1', 'Raku')])
+
+    @skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_parquet_export_has_one_json_column_per_step(self):
+        import pyarrow.parquet as pq
+        output = os.path.join(self.tmp.name, 'out.parquet')
+        self.export('--format', 'parquet', '--output', output, '--chunk-size', '1')
+        table = pq.read_table(output)
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column('session_id').to_pylist(), ['s1', 's2'])
+        self.assertEqual(json.loads(table.column('course_idea').to_pylist()[0]), {'course_title': 'Pottery', 'format': 'video'})
+        self.assertEqual(pq.ParquetFile(output).num_row_groups, 2)
+
+
+class CompileBlueprintTests(SimpleTestCase):
+    def blueprint(self):
+        return {
+            'meet_you': {
+                'full_name': 'Ada Lovelace',
+                'bio': 'I teach wheel-thrown pottery to complete beginners. ' * 120,
+                'photos': ['https://res.cloudinary.com/demo/a.png', 'https://res.cloudinary.com/demo/b.png'],
+            },
+            'course_idea': {
+                'course_title': 'Pottery at Home',
+                'pitch': 'Centre clay, pull walls and glaze without a studio. ' * 60,
+                'notes': '',
+                'modules': {'first': 'Wedging and centring ' * 40},
+            },
+            'brand_vibe': None,
+        }
+
+    def test_fits_under_budget_unchanged(self):
+        compiled = compile_blueprint({'course_idea': {'course_title': 'Pottery', 'notes': ''}}, 100)
+        self.assertEqual(compiled.text, 'course_idea.course_title: Pottery')
+        self.assertEqual(compiled.truncated_fields, [])
+        self.assertEqual(compiled.tokens, compiled.original_tokens)
+
+    def test_stays_within_budget_and_only_cuts_long_answers(self):
+        for budget in (60, 250, 800):
+            with self.subTest(budget=budget):
+                compiled = compile_blueprint(self.blueprint(), budget)
+                self.assertGreater(compiled.original_tokens, budget)
+                self.assertLessEqual(compiled.tokens, budget)
+                self.assertEqual(compiled.tokens, estimate_tokens(compiled.text))
+                self.assertIn('meet_you.bio', compiled.truncated_fields)
+                self.assertLessEqual(
+                    set(compiled.truncated_fields),
+                    {'meet_you.bio', 'course_idea.pitch', 'course_idea.modules.first'},
+                )
+                lines = compiled.text.splitlines()
+                self.assertIn('meet_you.full_name: Ada Lovelace', lines)
+                self.assertIn('meet_you.photos: [2 files]', lines)
+                self.assertIn('course_idea.course_title: Pottery at Home', lines)
+                self.assertFalse(any(line.startswith(('course_idea.notes', 'brand_vibe')) for line in lines))
+
+
+class SmartCompressTests(SimpleTestCase):
+    def noise_png(self, size=(256, 256)):
+        # Random pixels don't compress, so JPEG size tracks quality closely
+        pixels = random.Random(0).randbytes(size[0] * size[1] * 3)
+        buffer = BytesIO()
+        Image.frombytes('RGB', size, pixels).save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    def test_small_file_is_returned_without_encoding(self):
+        data = image_bytes('red')
+        stats = {}
+        self.assertEqual(smart_compress_to_bytes(data, target_bytes=len(data), stats=stats), data)
+        self.assertEqual(stats['encodes'], 0)
+
+    def test_binary_search_picks_highest_quality_that_fits(self):
+        stats = {}
+        data = smart_compress_to_bytes(self.noise_png(), target_bytes=40000, stats=stats)
+        self.assertLessEqual(len(data), 40000)
+        self.assertEqual(Image.open(BytesIO(data)).format, 'JPEG')
+        self.assertFalse(stats['resized'])
+        self.assertEqual(stats['size'], (256, 256))
+        # One step up no longer fits, and 8 candidate qualities take at most 4 probes
+        self.assertEqual(stats['quality'], 75)
+        self.assertLessEqual(stats['encodes'], 4)
+
+    def test_downscales_when_min_quality_is_too_large(self):
+        stats = {}
+        data = smart_compress_to_bytes(self.noise_png(), target_bytes=10000, stats=stats)
+        self.assertLessEqual(len(data), 10000)
+        self.assertTrue(stats['resized'])
+        self.assertEqual(stats['quality'], 60)
+        self.assertLess(stats['size'][0], 256)
+        self.assertEqual(Image.open(BytesIO(data)).size, stats['size'])
+        self.assertLessEqual(stats['encodes'], 4 + 3)
+
+
+@override_settings(UPLOAD_COMPRESS_PROCESSES=0, CLOUDINARY_STUB_LATENCY=0)
+class ImportMediaTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.library = os.path.join(tmp.name, 'library')
+        self.checkpoint = os.path.join(tmp.name, 'import.checkpoint')
+        os.makedirs(os.path.join(self.library, 'sub'))
+        self.write('a.png', image_bytes('red'))
+        self.write('b.png', image_bytes('blue'))
+        self.write('sub/copy-of-a.png', image_bytes('red'))
+        self.write('notes.txt', b'not an image')
+
+    def write(self, name, data):
+        with open(os.path.join(self.library, name), 'wb') as f:
+            f.write(data)
+
+    def run_import(self, *args, source=None):
+        out, err = StringIO(), StringIO()
+        call_command(
+            'import_media', source or self.library, '--stub', '--folder', 'library',
+            '--checkpoint', self.checkpoint, '--batch-size', '2', *args, stdout=out, stderr=err,
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_imports_skips_duplicates_and_resumes_from_checkpoint(self):
+        out, _ = self.run_import()
+        self.assertIn('3 file(s) found, 0 already imported', out)
+        self.assertIn('Imported 2 new asset(s)', out)
+        self.assertIn('1 already in the gallery', out)
+        self.assertEqual(sorted(MediaAsset.objects.values_list('title', flat=True)), ['a.png', 'b.png'])
+        self.assertEqual(set(MediaAsset.objects.values_list('folder', flat=True)), {'library'})
+        with open(self.checkpoint) as f:
+            self.assertEqual(len(f.read().splitlines()), 3)
+
+        out, _ = self.run_import()
+        self.assertIn('Nothing to import', out)
+
+        self.write('c.png', image_bytes('green'))
+        out, _ = self.run_import()
+        self.assertIn('4 file(s) found, 3 already imported', out)
+        self.assertEqual(MediaAsset.objects.count(), 3)
+
+        out, _ = self.run_import('--restart')
+        self.assertIn('Imported 0 new asset(s)', out)
+        self.assertEqual(MediaAsset.objects.count(), 3)
+
+    def test_manifest_failures_are_retried_on_the_next_run(self):
+        manifest = os.path.join(self.library, 'manifest.csv')
+        with open(manifest, 'w', newline='') as f:
+            csv.writer(f).writerows([['path', 'title'], ['b.png', 'Blue'], ['missing.png', '']])
+
+        _, err = self.run_import(source=manifest)
+        self.assertIn('Could not read', err)
+        self.assertEqual(list(MediaAsset.objects.values_list('title', flat=True)), ['Blue'])
+
+        self.write('missing.png', image_bytes('green'))
+        out, _ = self.run_import(source=manifest)
+        self.assertIn('2 file(s) found, 1 already imported', out)
+        self.assertEqual(MediaAsset.objects.count(), 2)
+
+
+class SessionStepEndpointTests(StaffClientMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = OnboardingSession.objects.create(
+            session_id='s1', course_idea={'course_title': 'Pottery', 'notes': ''}
+        )
+        self.url = f'/dashboard/sessions/{self.session.id}/steps/course_idea/'
+
+    def test_revalidation_returns_304_until_the_session_changes(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([field['key'] for field in response.json()['fields']], ['course_title'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+
+        # Auth session and user, then only the timestamp
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        self.session.course_idea = {'course_title': 'Raku'}
+        self.session.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Raku', response.json()['fields'][0]['html'])
+
+    def test_unknown_step_or_session_is_404(self):
+        self.assertEqual(self.client.get(f'/dashboard/sessions/{self.session.id}/steps/password/').status_code, 404)
+        self.assertEqual(self.client.get('/dashboard/sessions/999/steps/course_idea/').status_code, 404)
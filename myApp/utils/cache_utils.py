@@ -0,0 +1,14 @@
+"""
+Cache utilities
+"""
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared_cache(alias='default'):
+    """
+    True when every worker process sees the same cache (Redis, memcached,
+    database, file). LocMemCache and DummyCache are private to one process.
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
@@ -2,9 +2,12 @@
 Cloudinary utilities for image upload and optimization
 """
 import io
-from PIL import Image
+import time
+import uuid
+from PIL import Image, ImageOps
 import cloudinary
 import cloudinary.uploader
+import cloudinary.utils
 from django.conf import settings
 import os
 
@@ -12,83 +15,254 @@ import os
 MAX_BYTES = 10 * 1024 * 1024  # 10MB
 TARGET_BYTES = int(MAX_BYTES * 0.93)  # 9.3MB target
 
+# URL variants served through Cloudinary transformations, and how to render each locally
+DERIVATIVES = {
+    'web': {'transformation': 'f_webp,q_80,w_1920', 'size': (1920, None), 'quality': 80},
+    'thumbnail': {'transformation': 'f_webp,q_70,w_400,h_400,c_fill', 'size': (400, 400), 'quality': 70},
+}
 
-def smart_compress_to_bytes(image_file, target_bytes=TARGET_BYTES, max_quality=95, min_quality=60):
+
+def get_file_size(image_file):
+    """Size in bytes of an upload without reading it into memory"""
+    if isinstance(image_file, (bytes, bytearray)):
+        return len(image_file)
+    size = getattr(image_file, 'size', None)  # Django UploadedFile
+    if size is not None:
+        return size
+    if hasattr(image_file, 'seek') and hasattr(image_file, 'tell'):
+        position = image_file.tell()
+        image_file.seek(0, io.SEEK_END)
+        size = image_file.tell()
+        image_file.seek(position)
+        return size
+    return 0
+
+
+def _read_all(image_file):
+    if isinstance(image_file, (bytes, bytearray)):
+        return bytes(image_file)
+    if hasattr(image_file, 'seek'):
+        image_file.seek(0)
+    return image_file.read() if hasattr(image_file, 'read') else image_file
+
+
+def _open_rgb(image_file, draft_size=None):
+    """
+    Open and decode an image as RGB (flattening transparency onto white).
+    With draft_size, JPEGs are decoded at the smallest 1/2, 1/4 or 1/8
+    scale that is still at least that size, which is much faster for huge photos.
+    """
+    if hasattr(image_file, 'seek'):
+        image_file.seek(0)
+    img = Image.open(io.BytesIO(image_file) if isinstance(image_file, (bytes, bytearray)) else image_file)
+    if draft_size and img.format == 'JPEG':
+        img.draft('RGB', draft_size)
+    
+    # Convert RGBA to RGB if needed (for JPEG compatibility)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+    img.load()
+    return img
+
+
+def _encode_jpeg(img, quality, stats):
+    output = io.BytesIO()
+    img.save(output, format='JPEG', quality=quality, optimize=True)
+    stats['encodes'] = stats.get('encodes', 0) + 1
+    return output.getvalue()
+
+
+def _best_quality_encode(img, target_bytes, qualities, stats):
+    """
+    Binary search `qualities` (ascending) for the highest one whose encode
+    fits target_bytes. Returns (data, quality), or (smallest encode, None) if none fit.
+    """
+    lo, hi = 0, len(qualities) - 1
+    best = None
+    smallest = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        data = _encode_jpeg(img, qualities[mid], stats)
+        if len(data) <= target_bytes:
+            best = (data, qualities[mid])
+            lo = mid + 1
+        else:
+            if mid == 0:
+                smallest = data
+            hi = mid - 1
+    if best:
+        return best
+    return smallest, None
+
+
+def smart_compress_to_bytes(image_file, target_bytes=TARGET_BYTES, max_quality=95, min_quality=60, stats=None):
     """
     Compress an image to target size while maintaining quality.
-    Uses progressive quality reduction if needed.
+    Picks the highest quality (in steps of 5) that fits with a binary search,
+    then downscales if even min_quality is too large. Pass a dict as `stats`
+    to get the number of encodes, chosen quality and final dimensions.
     """
+    if stats is None:
+        stats = {}
+    stats.update({'encodes': 0, 'quality': None, 'resized': False})
     try:
-        # Open image
-        img = Image.open(image_file)
+        # If already small enough, return as-is (size comes from the file, not a copy)
+        if get_file_size(image_file) <= target_bytes:
+            return _read_all(image_file)
         
-        # Convert RGBA to RGB if needed (for JPEG compatibility)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-            img = background
+        # Decode once; every quality probe re-encodes the same pixels
+        img = _open_rgb(image_file)
+        qualities = list(range(min_quality, max_quality + 1, 5))
+        if qualities[-1] != max_quality:
+            qualities.append(max_quality)
+        data, quality = _best_quality_encode(img, target_bytes, qualities, stats)
+        if quality is not None:
+            stats.update({'quality': quality, 'size': img.size})
+            return data
         
-        # Get original size
-        original_size = len(image_file.read()) if hasattr(image_file, 'read') else 0
-        image_file.seek(0) if hasattr(image_file, 'seek') else None
-        
-        # If already small enough, return as-is
-        if original_size <= target_bytes:
-            image_file.seek(0) if hasattr(image_file, 'seek') else None
-            return image_file.read() if hasattr(image_file, 'read') else image_file
-        
-        # Try different quality levels
-        quality = max_quality
-        output = io.BytesIO()
-        
-        while quality >= min_quality:
-            output.seek(0)
-            output.truncate(0)
-            
-            # Save with current quality
-            img.save(output, format='JPEG', quality=quality, optimize=True)
-            
-            # Check size
-            size = output.tell()
-            if size <= target_bytes:
-                output.seek(0)
-                return output.read()
-            
-            # Reduce quality for next iteration
-            quality -= 5
-        
-        # If still too large, try resizing
-        if output.tell() > target_bytes:
-            # Calculate resize factor
-            current_size = output.tell()
-            resize_factor = (target_bytes / current_size) ** 0.5
-            new_width = int(img.width * resize_factor)
-            new_height = int(img.height * resize_factor)
-            
-            # Resize image
-            img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Save resized image
-            output.seek(0)
-            output.truncate(0)
-            img_resized.save(output, format='JPEG', quality=min_quality, optimize=True)
-            output.seek(0)
-            return output.read()
-        
-        # Fallback: return what we have
-        output.seek(0)
-        return output.read()
+        # Still too large at min_quality: downscale by the byte overshoot and retry
+        original_size = img.size
+        for _ in range(3):
+            resize_factor = (target_bytes / len(data)) ** 0.5 * 0.95
+            new_size = (max(1, int(img.width * resize_factor)), max(1, int(img.height * resize_factor)))
+            if img.size == original_size:
+                # First shrink: redecode huge JPEGs at reduced scale instead of resampling full size
+                img = _open_rgb(image_file, draft_size=new_size)
+            # reducing_gap: box-reduce by an integer factor first, then LANCZOS the rest
+            img = img.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            stats['resized'] = True
+            data = _encode_jpeg(img, min_quality, stats)
+            if len(data) <= target_bytes:
+                break
+        stats.update({'quality': min_quality, 'size': img.size})
+        return data
     
     except Exception as e:
         # If compression fails, return original
         print(f"Compression error: {e}")
-        if hasattr(image_file, 'seek'):
-            image_file.seek(0)
-        if hasattr(image_file, 'read'):
-            return image_file.read()
-        return image_file
+        return _read_all(image_file)
+
+
+def perceptual_hash(img):
+    """64-bit difference hash (hex): near-identical images get equal or close hashes"""
+    small = img.convert('L').resize((9, 8), Image.Resampling.BILINEAR)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f'{bits:016x}'
+
+
+def render_derivatives(img):
+    """
+    Render each DERIVATIVES variant locally the way Cloudinary does
+    (w_ scales to width, c_fill crops to the box) and measure it.
+    Returns {'web': {'width', 'height', 'bytes'}, 'thumbnail': {...}}.
+    """
+    derivatives = {}
+    for name, spec in DERIVATIVES.items():
+        width, height = spec['size']
+        if height is None:
+            height = max(1, round(img.height * width / img.width))
+            rendered = img.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        else:
+            rendered = ImageOps.fit(img, (width, height), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        rendered.save(output, format='WEBP', quality=spec['quality'])
+        derivatives[name] = {'width': rendered.width, 'height': rendered.height, 'bytes': output.tell()}
+    return derivatives
+
+
+def analyze_image(image_file):
+    """Perceptual hash and rendered derivative sizes for an image ({} if it can't be decoded)"""
+    try:
+        # Derivatives are at most 1920 wide, so huge JPEGs can be decoded at reduced scale
+        web_width = DERIVATIVES['web']['size'][0]
+        img = _open_rgb(image_file, draft_size=(web_width, web_width))
+        return {'perceptual_hash': perceptual_hash(img), 'derivatives': render_derivatives(img)}
+    except Exception as e:
+        print(f"Image analysis error: {e}")
+        return {}
+
+
+def build_upload_result(upload_result):
+    """Asset dict (with web/thumbnail URL variants) from a Cloudinary upload response"""
+    # Generate URL variants
+    secure_url = upload_result.get('secure_url', '')
+    public_id = upload_result.get('public_id', '')
+    
+    # Web-optimized URL
+    web_url = secure_url.replace('/upload/', f"/upload/{DERIVATIVES['web']['transformation']}/")
+    
+    # Thumbnail URL
+    thumbnail_url = secure_url.replace('/upload/', f"/upload/{DERIVATIVES['thumbnail']['transformation']}/")
+    
+    return {
+        'url': upload_result.get('url', ''),
+        'secure_url': secure_url,
+        'public_id': public_id,
+        'web_url': web_url,
+        'thumbnail_url': thumbnail_url,
+        'width': upload_result.get('width', 0),
+        'height': upload_result.get('height', 0),
+        'format': upload_result.get('format', ''),
+        'bytes': upload_result.get('bytes', 0),
+        'original_url': secure_url,  # Keep original for reference
+    }
+
+
+def upload_bytes_to_cloudinary(data, folder='katek_ai/uploads', public_id=None, resource_type='image'):
+    """Upload already-compressed image bytes to Cloudinary (the network half of upload_to_cloudinary)"""
+    # Bytes are sent as-is; wrapping them in BytesIO would only copy them again
+    upload_result = cloudinary.uploader.upload(
+        data,
+        folder=folder,
+        public_id=public_id,
+        resource_type=resource_type,
+        overwrite=True,
+        invalidate=True,
+        transformation=[
+            {'quality': 'auto', 'fetch_format': 'auto'}
+        ]
+    )
+    return build_upload_result(upload_result)
+
+
+def stub_upload_bytes(data, folder='katek_ai/uploads', public_id=None, resource_type='image'):
+    """
+    Local stand-in for upload_bytes_to_cloudinary (no network), used for
+    benchmarks and offline development. Sleeps CLOUDINARY_STUB_LATENCY
+    seconds to mimic the upload round trip.
+    """
+    time.sleep(getattr(settings, 'CLOUDINARY_STUB_LATENCY', 0))
+    with Image.open(io.BytesIO(data)) as img:
+        width, height = img.size
+        image_format = (img.format or 'jpeg').lower().replace('jpeg', 'jpg')
+    public_id = f'{folder}/{public_id or uuid.uuid4().hex}'
+    secure_url = f'https://res.cloudinary.com/stub/{resource_type}/upload/{public_id}.{image_format}'
+    return build_upload_result({
+        'url': secure_url.replace('https://', 'http://'),
+        'secure_url': secure_url,
+        'public_id': public_id,
+        'width': width,
+        'height': height,
+        'format': image_format,
+        'bytes': len(data),
+    })
+
+
+def get_image_uploader():
+    """Image upload function: the local stub when CLOUDINARY_STUB_UPLOADS is set, otherwise Cloudinary"""
+    if getattr(settings, 'CLOUDINARY_STUB_UPLOADS', False):
+        return stub_upload_bytes
+    return upload_bytes_to_cloudinary
 
 
 def upload_to_cloudinary(image_file, folder='katek_ai/uploads', public_id=None, resource_type='image'):
@@ -102,44 +276,8 @@ def upload_to_cloudinary(image_file, folder='katek_ai/uploads', public_id=None,
         # Compress image before upload
         compressed_data = smart_compress_to_bytes(image_file)
         
-        # Create file-like object from compressed data
-        compressed_file = io.BytesIO(compressed_data)
-        
         # Upload to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            compressed_file,
-            folder=folder,
-            public_id=public_id,
-            resource_type=resource_type,
-            overwrite=True,
-            invalidate=True,
-            transformation=[
-                {'quality': 'auto', 'fetch_format': 'auto'}
-            ]
-        )
-        
-        # Generate URL variants
-        secure_url = upload_result.get('secure_url', '')
-        public_id = upload_result.get('public_id', '')
-        
-        # Web-optimized URL
-        web_url = secure_url.replace('/upload/', '/upload/f_webp,q_80,w_1920/')
-        
-        # Thumbnail URL
-        thumbnail_url = secure_url.replace('/upload/', '/upload/f_webp,q_70,w_400,h_400,c_fill/')
-        
-        return {
-            'url': upload_result.get('url', ''),
-            'secure_url': secure_url,
-            'public_id': public_id,
-            'web_url': web_url,
-            'thumbnail_url': thumbnail_url,
-            'width': upload_result.get('width', 0),
-            'height': upload_result.get('height', 0),
-            'format': upload_result.get('format', ''),
-            'bytes': upload_result.get('bytes', 0),
-            'original_url': secure_url,  # Keep original for reference
-        }
+        return get_image_uploader()(compressed_data, folder=folder, public_id=public_id, resource_type=resource_type)
     
     except Exception as e:
         print(f"Cloudinary upload error: {e}")
@@ -163,16 +301,26 @@ def upload_file_to_cloudinary(file, folder='katek_ai/onboarding', public_id=None
         return upload_to_cloudinary(file, folder=folder, public_id=public_id, resource_type='image')
 
     # Raw upload for PDF, ZIP, DOCX, etc.
-    import cloudinary.uploader
     try:
-        file.seek(0)
-        result = cloudinary.uploader.upload(
-            file,
-            folder=folder,
-            public_id=public_id,
-            resource_type='raw',
-            overwrite=True,
-        )
+        if getattr(settings, 'CLOUDINARY_STUB_UPLOADS', False):
+            result = stub_upload_file(file, folder=folder, public_id=public_id)
+        elif get_file_size(file) > getattr(settings, 'CLOUDINARY_CHUNKED_UPLOAD_THRESHOLD', 20 * 1024 * 1024):
+            result = upload_large_resumable(
+                file,
+                folder=folder,
+                public_id=public_id,
+                resource_type='raw',
+                overwrite=True,
+            )
+        else:
+            file.seek(0)
+            result = cloudinary.uploader.upload(
+                file,
+                folder=folder,
+                public_id=public_id,
+                resource_type='raw',
+                overwrite=True,
+            )
         return {
             'secure_url': result.get('secure_url', result.get('url', '')),
             'public_id': result.get('public_id', ''),
@@ -182,3 +330,65 @@ def upload_file_to_cloudinary(file, folder='katek_ai/onboarding', public_id=None
         print(f"Cloudinary raw upload error: {e}")
         raise Exception(f"Failed to upload file: {str(e)}")
 
+
+def iter_file_chunks(file, chunk_size):
+    """
+    Yield a file's contents chunk by chunk from the start. Django uploads
+    over FILE_UPLOAD_MAX_MEMORY_SIZE are read from their temporary file on
+    disk, so only one chunk is in memory at a time.
+    """
+    if hasattr(file, 'chunks'):
+        # UploadedFile.chunks() seeks to the start itself
+        yield from file.chunks(chunk_size)
+        return
+    file.seek(0)
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def upload_large_resumable(file, chunk_size=None, max_retries=3, **options):
+    """
+    Chunked upload to Cloudinary (like cloudinary.uploader.upload_large) that
+    retries a failed chunk instead of restarting the whole file. Memory use
+    is one chunk (CLOUDINARY_UPLOAD_CHUNK_SIZE) regardless of file size.
+    """
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'CLOUDINARY_UPLOAD_CHUNK_SIZE', 20 * 1024 * 1024)
+    file_size = get_file_size(file)
+    file_name = os.path.basename(getattr(file, 'name', '') or 'upload')
+    upload_id = cloudinary.utils.random_public_id()
+    
+    result = None
+    position = 0
+    for chunk in iter_file_chunks(file, chunk_size):
+        http_headers = {
+            'Content-Range': f'bytes {position}-{position + len(chunk) - 1}/{file_size}',
+            'X-Unique-Upload-Id': upload_id,
+        }
+        for attempt in range(max_retries + 1):
+            try:
+                result = cloudinary.uploader.upload_large_part((file_name, chunk), http_headers=http_headers, **options)
+                break
+            except Exception:
+                if attempt == max_retries:
+                    raise
+                time.sleep(2 ** attempt)
+        # Later chunks must target the public_id Cloudinary assigned
+        options['public_id'] = result.get('public_id')
+        position += len(chunk)
+    return result
+
+
+def stub_upload_file(file, folder='katek_ai/onboarding', public_id=None, chunk_size=1024 * 1024):
+    """Local stand-in for raw uploads: streams the file in chunks without sending it anywhere"""
+    size = 0
+    for chunk in iter_file_chunks(file, chunk_size):
+        size += len(chunk)
+    time.sleep(getattr(settings, 'CLOUDINARY_STUB_LATENCY', 0))
+    name = os.path.basename(getattr(file, 'name', '') or 'upload')
+    public_id = f'{folder}/{public_id or uuid.uuid4().hex}_{name}'
+    secure_url = f'https://res.cloudinary.com/stub/raw/upload/{public_id}'
+    return {'secure_url': secure_url, 'url': secure_url, 'public_id': public_id, 'bytes': size}
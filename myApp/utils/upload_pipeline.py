@@ -0,0 +1,178 @@
+"""
+Concurrent image upload pipeline
+
+Compression (CPU-bound PIL encoding) runs in a process pool and uploads
+(blocking network calls) run in a bounded thread pool, so a multi-file drop
+takes roughly as long as its slowest file instead of the sum of all of them.
+Results are yielded per file as soon as each one finishes.
+
+A file's content may be bytes, a path (e.g. the temporary file Django
+spooled a large upload to) or a file object; paths and file objects are
+only read by the worker that compresses them, so a large batch is never
+held in memory at once.
+"""
+import io
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import django
+from django.conf import settings
+
+from .cloudinary_utils import smart_compress_to_bytes, analyze_image, get_image_uploader
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def read_source(source):
+    """Bytes of a file's content: bytes, a path, or a file object (read from the start)"""
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read()
+    source.seek(0)
+    return source.read()
+
+
+def iter_source_chunks(source, chunk_size=1024 * 1024):
+    """A file's content (see read_source) in chunks, without reading it all at once"""
+    if isinstance(source, bytes):
+        yield source
+        return
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+        return
+    source.seek(0)
+    while chunk := source.read(chunk_size):
+        yield chunk
+
+
+def _compress(data):
+    """Compressed JPEG bytes for raw image bytes"""
+    return smart_compress_to_bytes(io.BytesIO(data))
+
+
+def _prepare(source):
+    """Process-pool entry point: (compressed bytes, perceptual hash + derivative sizes)"""
+    data = read_source(source)
+    return _compress(data), analyze_image(io.BytesIO(data))
+
+
+def get_compress_pool():
+    """
+    Shared process pool for image compression, created on first use.
+    Returns None when UPLOAD_COMPRESS_PROCESSES is 0 (compress in the upload threads).
+    """
+    global _process_pool
+    processes = getattr(settings, 'UPLOAD_COMPRESS_PROCESSES', None)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes <= 0:
+        return None
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawn: forking a threaded web worker can deadlock the child.
+            # Children load settings before cloudinary (settings imports it too).
+            _process_pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup
+            )
+        return _process_pool
+
+
+def _discard_compress_pool(pool):
+    """Drop a broken pool so the next call starts a fresh one"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+
+
+class UploadResult:
+    """
+    Outcome of one file: `asset` (the upload dict plus perceptual_hash and
+    derivatives) on success, `error` on failure
+    """
+    def __init__(self, index, name, asset=None, error=None):
+        self.index = index
+        self.name = name
+        self.asset = asset
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def iter_uploads(files, folder='katek_ai/uploads', uploader=None, upload_workers=None, compress_pool='default'):
+    """
+    Compress, analyze and upload `files` ((name, content) pairs, content as
+    bytes, a path or a file object) concurrently.
+    Yields an UploadResult per file in completion order. `uploader` defaults
+    to get_image_uploader() (Cloudinary, or the local stub).
+    """
+    files = list(files)
+    if not files:
+        return
+    uploader = uploader or get_image_uploader()
+    if upload_workers is None:
+        upload_workers = getattr(settings, 'UPLOAD_MAX_CONCURRENCY', 4)
+    if compress_pool == 'default':
+        compress_pool = get_compress_pool()
+
+    results = queue.Queue()
+    upload_pool = ThreadPoolExecutor(max_workers=max(1, upload_workers))
+
+    def upload(index, name, data, prepared=None):
+        try:
+            compressed, info = prepared or _prepare(data)
+            asset = uploader(compressed, folder=folder)
+            asset.update(info)
+            results.put(UploadResult(index, name, asset=asset))
+        except Exception as e:
+            results.put(UploadResult(index, name, error=str(e)))
+
+    def on_prepared(index, name, data, future):
+        try:
+            prepared = future.result()
+        except BrokenProcessPool:
+            # A compression process died; compress this file in its upload thread instead
+            prepared = None
+        except Exception as e:
+            results.put(UploadResult(index, name, error=f'Compression failed: {e}'))
+            return
+        try:
+            upload_pool.submit(upload, index, name, data, prepared)
+        except RuntimeError:
+            pass  # The caller stopped consuming results and the pool is shut down
+
+    try:
+        for index, (name, data) in enumerate(files):
+            if compress_pool is not None:
+                try:
+                    # Paths are read in the child process; file objects can't be pickled
+                    future = compress_pool.submit(
+                        _prepare, data if isinstance(data, (bytes, str, os.PathLike)) else read_source(data)
+                    )
+                except BrokenProcessPool:
+                    _discard_compress_pool(compress_pool)
+                    compress_pool = None
+                else:
+                    future.add_done_callback(partial(on_prepared, index, name, data))
+                    continue
+            upload_pool.submit(upload, index, name, data)
+
+        for _ in files:
+            yield results.get()
+    finally:
+        upload_pool.shutdown(wait=False)
@@ -3,7 +3,7 @@ Website Dashboard Views - For managing website content
 """
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
@@ -14,7 +14,11 @@ from .models import (
     MediaAsset, SEO, WebsiteHero, WebsiteSection, 
     WebsiteTestimonial, WebsiteFooter
 )
-from .utils.cloudinary_utils import upload_to_cloudinary
+from .dashboard_helpers import keyset_page
+from .media_helpers import (
+    iter_media_uploads, create_media_assets, search_assets, folder_facets,
+    parse_gallery_limit, GALLERY_FIELDS, GALLERY_PAGE_SIZE, GALLERY_SORT
+)
 
 
 @login_required
@@ -42,11 +46,70 @@ def website_dashboard_home(request):
     return render(request, 'myApp/website_dashboard/index.html', context)
 
 
+def _media_asset_payload(media_asset):
+    return {
+        'id': media_asset.id,
+        'title': media_asset.title,
+        'url': media_asset.cloudinary_url,
+        'web_url': media_asset.web_url,
+        'thumbnail_url': media_asset.thumbnail_url,
+        'public_id': media_asset.cloudinary_public_id,
+        'width': media_asset.width,
+        'height': media_asset.height,
+    }
+
+
+def _upload_source(image_file):
+    """Where the upload pipeline reads a file: Django's temporary file for large uploads, else the in-memory file"""
+    if hasattr(image_file, 'temporary_file_path'):
+        return image_file.temporary_file_path()
+    return image_file
+
+
+def _distinct_assets(media_assets):
+    """Assets from a {file index: MediaAsset} map, once each, in file order"""
+    return list({media_assets[index].id: media_assets[index] for index in sorted(media_assets)}.values())
+
+
+def _upload_result_payload(result, media_asset=None):
+    return {
+        'index': result.index,
+        'name': result.name,
+        'success': result.ok,
+        'duplicate': result.duplicate,
+        'asset_id': media_asset.id if media_asset else None,
+        'error': result.error,
+    }
+
+
+def _iter_upload_ndjson(files, titles, folder):
+    """One JSON line per file as it finishes, then a final line with the created assets"""
+    results = []
+    for result in iter_media_uploads(files, folder=folder):
+        results.append(result)
+        yield json.dumps(_upload_result_payload(result, result.existing)) + '\n'
+    
+    media_assets = create_media_assets(results, titles, folder)
+    errors = [f'{result.name}: {result.error}' for result in results if not result.ok]
+    yield json.dumps({
+        'done': True,
+        'success': True,
+        'assets': [_media_asset_payload(media_asset) for media_asset in _distinct_assets(media_assets)],
+        'uploaded_count': len(media_assets),
+        'errors': errors if errors else None,
+    }) + '\n'
+
+
 @login_required
 @csrf_exempt
 @require_http_methods(["POST"])
 def website_upload_image(request):
-    """Upload single or multiple images to Cloudinary"""
+    """
+    Upload single or multiple images to Cloudinary.
+    Files are compressed and uploaded concurrently, and files already in the
+    gallery resolve to the existing asset. POST stream=1 to receive per-file
+    results as NDJSON lines as each one completes.
+    """
     try:
         # Handle multiple images
         images = request.FILES.getlist('images[]') or request.FILES.getlist('image')
@@ -55,49 +118,30 @@ def website_upload_image(request):
             return JsonResponse({'success': False, 'error': 'No image files provided'}, status=400)
         
         folder = request.POST.get('folder', 'katek_ai/uploads')
-        uploaded_assets = []
-        errors = []
         
-        for idx, image_file in enumerate(images):
-            try:
-                # Upload to Cloudinary
-                upload_result = upload_to_cloudinary(image_file, folder=folder)
-                
-                # Get title from form or use filename
-                title = request.POST.get(f'title_{idx}', '') or request.POST.get('title', '') or image_file.name
-                
-                # Save to database
-                media_asset = MediaAsset.objects.create(
-                    title=title,
-                    cloudinary_url=upload_result['secure_url'],
-                    cloudinary_public_id=upload_result['public_id'],
-                    original_url=upload_result['original_url'],
-                    web_url=upload_result['web_url'],
-                    thumbnail_url=upload_result['thumbnail_url'],
-                    folder=folder,
-                    width=upload_result['width'],
-                    height=upload_result['height'],
-                    file_size=upload_result['bytes'],
-                    format=upload_result['format'],
-                )
-                
-                uploaded_assets.append({
-                    'id': media_asset.id,
-                    'title': media_asset.title,
-                    'url': media_asset.cloudinary_url,
-                    'web_url': media_asset.web_url,
-                    'thumbnail_url': media_asset.thumbnail_url,
-                    'public_id': media_asset.cloudinary_public_id,
-                    'width': media_asset.width,
-                    'height': media_asset.height,
-                })
-            except Exception as e:
-                errors.append(f'{image_file.name}: {str(e)}')
+        # Get title from form or use filename
+        titles = [
+            request.POST.get(f'title_{idx}', '') or request.POST.get('title', '') or image_file.name
+            for idx, image_file in enumerate(images)
+        ]
+        # Contents are read by the upload workers, not all up front
+        files = [(image_file.name, _upload_source(image_file)) for image_file in images]
+        
+        if request.POST.get('stream') == '1':
+            return StreamingHttpResponse(
+                _iter_upload_ndjson(files, titles, folder),
+                content_type='application/x-ndjson'
+            )
+        
+        results = list(iter_media_uploads(files, folder=folder))
+        media_assets = create_media_assets(results, titles, folder)
+        errors = [f'{result.name}: {result.error}' for result in results if not result.ok]
         
         return JsonResponse({
             'success': True,
-            'assets': uploaded_assets,
-            'uploaded_count': len(uploaded_assets),
+            'assets': [_media_asset_payload(media_asset) for media_asset in _distinct_assets(media_assets)],
+            'uploaded_count': len(media_assets),
+            'results': [_upload_result_payload(result, media_assets.get(result.index)) for result in results],
             'errors': errors if errors else None
         })
     
@@ -105,31 +149,49 @@ def website_upload_image(request):
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
+def _gallery_assets(request):
+    """
+    Gallery queryset filtered by the search query (q), before the folder
+    filter so folder facet counts reflect the search. Returns (assets, q, folder).
+    """
+    search_query = request.GET.get('q', '').strip()
+    folder_filter = request.GET.get('folder', '')
+    assets = search_assets(MediaAsset.objects.only(*GALLERY_FIELDS), search_query)
+    return assets, search_query, folder_filter
+
+
+def _gallery_image_payload(img):
+    return {
+        'id': img.id,
+        'title': img.title,
+        'url': img.cloudinary_url,
+        'web_url': img.web_url,
+        'thumbnail_url': img.thumbnail_url,
+        'original_url': img.original_url,
+        'width': img.width,
+        'height': img.height,
+        'format': img.format,
+        'folder': img.folder,
+    }
+
+
 @login_required
 def website_gallery(request):
-    """Image gallery page"""
-    images = MediaAsset.objects.all()
+    """Image gallery page (first page server-rendered, more loaded from the gallery API)"""
+    assets, search_query, folder_filter = _gallery_assets(request)
+    folders = folder_facets(assets)
     
-    # Filter by folder if provided
-    folder_filter = request.GET.get('folder', '')
     if folder_filter:
-        images = images.filter(folder=folder_filter)
-    
-    # Search
-    search_query = request.GET.get('q', '')
-    if search_query:
-        images = images.filter(title__icontains=search_query)
-    
-    images = images.order_by('-created_at')
-    
-    # Get unique folders
-    folders = MediaAsset.objects.values_list('folder', flat=True).distinct()
+        assets = assets.filter(folder=folder_filter)
+    images, next_cursor = keyset_page(assets, GALLERY_SORT, limit=GALLERY_PAGE_SIZE)
     
     context = {
         'images': images,
         'folders': folders,
+        'total_count': sum(facet['count'] for facet in folders),
         'folder_filter': folder_filter,
         'search_query': search_query,
+        'next_cursor': next_cursor,
     }
     
     return render(request, 'myApp/website_dashboard/gallery.html', context)
@@ -137,40 +199,36 @@ def website_gallery(request):
 
 @login_required
 def website_gallery_api(request):
-    """API endpoint to get gallery images as JSON"""
-    images = MediaAsset.objects.all().order_by('-created_at')
+    """
+    API endpoint to get gallery images as JSON, newest first.
+    GET params: q (title or word prefix), folder, cursor, limit (max 100).
+    The first page (no cursor) also carries folder facet counts for the search.
+    """
+    assets, search_query, folder_filter = _gallery_assets(request)
+    cursor = request.GET.get('cursor')
+    facets = None if cursor else folder_facets(assets)
     
-    # Filter by folder if provided
-    folder_filter = request.GET.get('folder', '')
     if folder_filter:
-        images = images.filter(folder=folder_filter)
+        assets = assets.filter(folder=folder_filter)
+    limit = parse_gallery_limit(request.GET.get('limit'))
     
-    # Search
-    search_query = request.GET.get('q', '')
-    if search_query:
-        images = images.filter(title__icontains=search_query)
-    
-    # Limit results for performance
-    limit = int(request.GET.get('limit', 100))
-    images = images[:limit]
+    try:
+        images, next_cursor = keyset_page(assets, GALLERY_SORT, cursor=cursor, limit=limit)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     
-    images_data = [{
-        'id': img.id,
-        'title': img.title,
-        'url': img.cloudinary_url,
-        'web_url': img.web_url,
-        'thumbnail_url': img.thumbnail_url,
-        'original_url': img.original_url,
-        'width': img.width,
-        'height': img.height,
-        'format': img.format,
-        'folder': img.folder,
-    } for img in images]
+    images_data = [_gallery_image_payload(img) for img in images]
     
     return JsonResponse({
         'success': True,
         'images': images_data,
-        'count': len(images_data)
+        'count': len(images_data),
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+        'facets': {
+            'folders': facets,
+            'total': sum(facet['count'] for facet in facets),
+        } if facets is not None else None,
     })
 
 
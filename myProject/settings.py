@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myApp.instrumentation.RequestMetricsMiddleware',  # first, so it times everything below
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,9 +64,20 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'myProject.urls'
 
+# Per-request query/latency metrics (staff JSON at /dashboard/metrics/, per process; off unless enabled)
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'False') == 'True'
+REQUEST_METRICS_BUFFER_SIZE = int(os.getenv('REQUEST_METRICS_BUFFER_SIZE', 500))  # most recent requests kept
+REQUEST_METRICS_SERVER_TIMING = os.getenv('REQUEST_METRICS_SERVER_TIMING', 'False') == 'True'  # add Server-Timing headers
+REQUEST_METRICS_QUERY_THRESHOLD = int(os.getenv('REQUEST_METRICS_QUERY_THRESHOLD', 30))  # log requests with this many queries
+REQUEST_METRICS_REPEAT_THRESHOLD = int(os.getenv('REQUEST_METRICS_REPEAT_THRESHOLD', 5))  # log one query shape repeated this often (N+1)
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # With request metrics on, a DjangoTemplates that reports render time to them
+        'BACKEND': (
+            'myApp.instrumentation.InstrumentedDjangoTemplates' if REQUEST_METRICS_ENABLED
+            else 'django.template.backends.django.DjangoTemplates'
+        ),
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -112,6 +124,65 @@ else:
 # OpenAI API Key
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+# Per-process cache of onboarding AI help responses (keyed by prompt fingerprint)
+AI_HELP_CACHE_TTL = int(os.getenv('AI_HELP_CACHE_TTL', 60 * 60))
+AI_HELP_CACHE_MAX_ENTRIES = int(os.getenv('AI_HELP_CACHE_MAX_ENTRIES', 1000))
+
+# Async OpenAI endpoints (enable when serving through ASGI, e.g. daphne myProject.asgi:application)
+AI_ASYNC_VIEWS = os.getenv('AI_ASYNC_VIEWS', 'False') == 'True'
+AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', 50))  # in-flight OpenAI calls per process
+AI_REQUEST_TIMEOUT = float(os.getenv('AI_REQUEST_TIMEOUT', 30))  # seconds per OpenAI call
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')  # e.g. a local fake LLM server for testing
+
+# Queue dashboard AI summaries instead of generating them inside the request.
+# Needs at least one `python manage.py run_ai_worker` process running.
+AI_JOB_QUEUE_ENABLED = os.getenv('AI_JOB_QUEUE_ENABLED', 'False') == 'True'
+AI_WORKER_CONCURRENCY = int(os.getenv('AI_WORKER_CONCURRENCY', 4))  # default jobs in parallel per worker
+AI_JOB_MAX_ATTEMPTS = int(os.getenv('AI_JOB_MAX_ATTEMPTS', 3))
+AI_JOB_STALE_SECONDS = int(os.getenv('AI_JOB_STALE_SECONDS', 15 * 60))  # running jobs older than this are requeued
+AI_JOB_RETRY_BASE_SECONDS = int(os.getenv('AI_JOB_RETRY_BASE_SECONDS', 30))  # first retry delay, doubled per failed attempt
+AI_JOB_RETRY_MAX_SECONDS = int(os.getenv('AI_JOB_RETRY_MAX_SECONDS', 60 * 60))
+
+# Link sessions to Clients in run_ai_worker instead of the autosave request
+# (only saves that change the meet_you email or name request a reconcile).
+# Follows AI_JOB_QUEUE_ENABLED by default, so without a worker the reconcile runs inline.
+CLIENT_RECONCILE_QUEUED = os.getenv('CLIENT_RECONCILE_QUEUED', str(AI_JOB_QUEUE_ENABLED)) == 'True'
+
+# Max tokens of blueprint data sent in a summary prompt (longest answers are shortened to fit)
+AI_SUMMARY_INPUT_TOKEN_BUDGET = int(os.getenv('AI_SUMMARY_INPUT_TOKEN_BUDGET', 2000))
+
+# Cache
+# Use REDIS_URL from .env file so all workers share cached content, otherwise fall back to local memory
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Full-page cache for the public homepage (opt-in). Invalidated on content edits.
+HOMEPAGE_CACHE_ENABLED = os.getenv('HOMEPAGE_CACHE_ENABLED', 'False') == 'True'
+HOMEPAGE_CACHE_TIMEOUT = int(os.getenv('HOMEPAGE_CACHE_TIMEOUT', 60 * 60))
+# Without REDIS_URL each worker has its own cache, so content edits reach the
+# other workers only when their homepage snapshot expires after this many seconds
+CONTENT_LOCAL_CACHE_SECONDS = int(os.getenv('CONTENT_LOCAL_CACHE_SECONDS', 30))
+
+# How long dashboard overview counts are cached (also invalidated on status changes)
+DASHBOARD_KPIS_CACHE_SECONDS = int(os.getenv('DASHBOARD_KPIS_CACHE_SECONDS', 30))
+
+# Write-behind buffer for onboarding autosaves (seconds; 0 = write every save directly).
+# Needs REDIS_URL so all workers share the buffer, plus a cron running
+# `python manage.py flush_onboarding_autosaves` to write out idle sessions.
+ONBOARDING_AUTOSAVE_BUFFER_SECONDS = int(os.getenv('ONBOARDING_AUTOSAVE_BUFFER_SECONDS', 0))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -176,4 +247,19 @@ cloudinary.config(
     api_key=os.getenv('CLOUDINARY_API_KEY', ''),
     api_secret=os.getenv('CLOUDINARY_API_SECRET', ''),
     secure=True
-)
\ No newline at end of file
+)
+# Image upload pipeline: compression processes (default: one per CPU, 0 = compress in
+# the upload threads) and concurrent uploads per request
+UPLOAD_COMPRESS_PROCESSES = int(os.getenv('UPLOAD_COMPRESS_PROCESSES')) if os.getenv('UPLOAD_COMPRESS_PROCESSES') else None
+UPLOAD_MAX_CONCURRENCY = int(os.getenv('UPLOAD_MAX_CONCURRENCY', 4))
+
+# Replace Cloudinary image uploads with a local stub (benchmarks / offline development)
+CLOUDINARY_STUB_UPLOADS = os.getenv('CLOUDINARY_STUB_UPLOADS', 'False') == 'True'
+CLOUDINARY_STUB_LATENCY = float(os.getenv('CLOUDINARY_STUB_LATENCY', 0))  # simulated seconds per upload
+
+# Uploads larger than this are streamed to a temporary file instead of held in memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv('FILE_UPLOAD_MAX_MEMORY_SIZE', 2621440))  # 2.5MB (Django default)
+
+# Raw onboarding files above the threshold are sent to Cloudinary in chunks (chunk size >= 5MB)
+CLOUDINARY_CHUNKED_UPLOAD_THRESHOLD = int(os.getenv('CLOUDINARY_CHUNKED_UPLOAD_THRESHOLD', 20 * 1024 * 1024))
+CLOUDINARY_UPLOAD_CHUNK_SIZE = int(os.getenv('CLOUDINARY_UPLOAD_CHUNK_SIZE', 20 * 1024 * 1024))
@@ -1,7 +1,16 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from myApp import views
 
+# Under ASGI the OpenAI-backed endpoints can await their LLM calls instead of holding a worker
+if settings.AI_ASYNC_VIEWS:
+    ai_help_view = views.onboarding_ai_help_async
+    generate_summary_view = views.dashboard_generate_ai_summary_async
+else:
+    ai_help_view = views.onboarding_ai_help
+    generate_summary_view = views.dashboard_generate_ai_summary
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.home, name='home'),
@@ -10,17 +19,22 @@ urlpatterns = [
     path('onboarding/', views.onboarding, name='onboarding'),
     path('api/onboarding/save/', views.onboarding_save, name='onboarding_save'),
     path('api/onboarding/upload/', views.onboarding_upload, name='onboarding_upload'),
-    path('api/onboarding/ai-help/', views.onboarding_ai_help, name='onboarding_ai_help'),
+    path('api/onboarding/ai-help/', ai_help_view, name='onboarding_ai_help'),
     
     # Dashboard routes
     path('dashboard/', views.dashboard_overview, name='dashboard_overview'),
     path('dashboard/sessions/', views.dashboard_sessions, name='dashboard_sessions'),
+    path('dashboard/api/sessions/', views.dashboard_sessions_api, name='dashboard_sessions_api'),
     path('dashboard/sessions/<int:session_id>/', views.dashboard_session_detail, name='dashboard_session_detail'),
+    path('dashboard/sessions/<int:session_id>/steps/<str:step>/', views.dashboard_session_step, name='dashboard_session_step'),
     path('dashboard/sessions/<int:session_id>/update-status/', views.dashboard_update_status, name='dashboard_update_status'),
     path('dashboard/sessions/<int:session_id>/assign/', views.dashboard_assign, name='dashboard_assign'),
     path('dashboard/sessions/<int:session_id>/add-note/', views.dashboard_add_note, name='dashboard_add_note'),
-    path('dashboard/sessions/<int:session_id>/generate-summary/', views.dashboard_generate_ai_summary, name='dashboard_generate_ai_summary'),
+    path('dashboard/sessions/<int:session_id>/generate-summary/', generate_summary_view, name='dashboard_generate_ai_summary'),
+    path('dashboard/ai-jobs/<int:job_id>/', views.dashboard_ai_job_status, name='dashboard_ai_job_status'),
+    path('dashboard/metrics/', views.dashboard_request_metrics, name='dashboard_request_metrics'),
     path('dashboard/export/csv/', views.dashboard_export_csv, name='dashboard_export_csv'),
+    path('dashboard/export/blueprints/', views.dashboard_export_blueprints, name='dashboard_export_blueprints'),
     
     # Website Dashboard routes
     path('website-dashboard/', include('myApp.website_dashboard_urls')),